@@ -0,0 +1,146 @@
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import json
+import signal
+import sys
+import threading
+from pathlib import Path
+
+from app.engine.backends import IS_MACOS
+from app.engine.foreground import AppProfileSwitcher, wait_pumping_events
+from app.engine.hook_engine import HookEngine
+from app.models.mapping_item import MappingItem
+from app.store.mapping_store import default_config_dir
+from app.store.profile_store import ProfileStore
+from app.store.recording_store import RecordingStore
+
+PROFILES_SUFFIX = "_profiles.json"
+
+
+def default_config() -> Path:
+    os_type = "macos" if IS_MACOS else "windows"
+    return default_config_dir() / f"{os_type}_mappings.json"
+
+
+class HeadlessRunner:
+    def __init__(self, config: Path, precise: bool = False, native_hook: bool = False):
+        self._config = config
+        self._engine = HookEngine(precise_timing=precise, native_hook=native_hook)
+        self._engine.recording_loader = RecordingStore(config.parent).load
+        self._switcher = AppProfileSwitcher(self._engine)
+        self._wake = threading.Event()
+        self._stopping = False
+        self._reload = False
+
+    def load(self) -> tuple[dict[str, list[MappingItem]], str]:
+        if self._config.name.endswith(PROFILES_SUFFIX):
+            os_type = self._config.name[: -len(PROFILES_SUFFIX)]
+            profiles = ProfileStore(os_type, write_behind=False, config_dir=self._config.parent)
+            self._engine.set_profile_switch_key(profiles.switch_key, profiles.switch_modifiers)
+            self._switcher.set_rules(profiles.app_rules, profiles.fallback)
+            return profiles.mappings_by_profile(), profiles.active
+
+        data = json.loads(self._config.read_text(encoding="utf-8"))
+        return {"": [MappingItem.from_dict(item) for item in data]}, ""
+
+    def start(self):
+        profiles, active = self.load()
+        self._engine.start_profiles(profiles, active)
+        self._switcher.start()
+        count = sum(len(mappings) for mappings in profiles.values())
+        print(f"Running {count} mappings from {self._config}", file=sys.stderr)
+
+    def reload(self):
+        try:
+            profiles, active = self.load()
+        except (OSError, ValueError) as e:
+            print(f"Reload failed, keeping current mappings: {e}", file=sys.stderr)
+            return
+        self._engine.update_profiles(profiles, active)
+        self._switcher.start()
+        print(f"Reloaded {self._config}", file=sys.stderr)
+
+    def stop(self):
+        self._switcher.stop()
+        self._engine.stop()
+
+    def request_stop(self, signum=None, frame=None):
+        self._stopping = True
+        self._wake.set()
+
+    def request_reload(self, signum=None, frame=None):
+        self._reload = True
+        self._wake.set()
+
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGINT, self.request_stop)
+        signal.signal(signal.SIGTERM, self.request_stop)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self.request_reload)
+
+    def run_forever(self):
+        while not self._stopping:
+            if not wait_pumping_events(self._wake, 1.0):
+                continue
+            self._wake.clear()
+            if self._reload and not self._stopping:
+                self._reload = False
+                self.reload()
+        self.stop()
+
+
+def main():
+    imported = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Run the key mapper without the GUI")
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=default_config(),
+        help="mappings file, or an <os>_profiles.json to load every profile",
+    )
+    parser.add_argument("--precise", action="store_true", help="use the precise timer")
+    parser.add_argument(
+        "--native-hook",
+        action="store_true",
+        help="use the ctypes WH_KEYBOARD_LL hook instead of pynput (Windows)",
+    )
+    parser.add_argument(
+        "--measure-startup",
+        action="store_true",
+        help="print startup time and peak memory once running, then exit",
+    )
+    args = parser.parse_args()
+
+    runner = HeadlessRunner(args.config, args.precise, args.native_hook)
+    try:
+        runner.start()
+    except (OSError, ValueError) as e:
+        print(f"Cannot load {args.config}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.measure_startup:
+        from app.startup import peak_rss_kb
+
+        started = time.perf_counter()
+        runner.stop()
+        print(
+            json.dumps(
+                {
+                    "import_ms": (imported - STARTED) * 1000,
+                    "running_ms": (started - STARTED) * 1000,
+                    "peak_rss_kb": peak_rss_kb(),
+                    "qt_loaded": "PySide6" in sys.modules,
+                }
+            )
+        )
+        return
+
+    runner.install_signal_handlers()
+    runner.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import ctypes
+import platform
+import threading
+import time
+from array import array
+
+from app.engine.keys import MOUSE_BUTTONS
+from app.engine.plan import KEY_DOWN, KEY_UP, MOUSE_DOWN, MOUSE_MOVE, MOUSE_UP, Plan
+
+IS_WINDOWS = platform.system() == "Windows"
+IS_MACOS = platform.system() == "Darwin"
+
+INJECTED_MARKER = 0xDEAD
+
+if IS_WINDOWS:
+    INPUT_KEYBOARD = 1
+    INPUT_MOUSE = 0
+    KEYEVENTF_KEYUP = 0x0002
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+    MOUSEEVENTF_RIGHTDOWN = 0x0008
+    MOUSEEVENTF_RIGHTUP = 0x0010
+    MOUSEEVENTF_MIDDLEDOWN = 0x0020
+    MOUSEEVENTF_MIDDLEUP = 0x0040
+
+    ULONG_PTR = ctypes.c_ulonglong if ctypes.sizeof(ctypes.c_void_p) == 8 else ctypes.c_ulong
+
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [
+            ("dx", ctypes.c_long),
+            ("dy", ctypes.c_long),
+            ("mouseData", ctypes.c_ulong),
+            ("dwFlags", ctypes.c_ulong),
+            ("time", ctypes.c_ulong),
+            ("dwExtraInfo", ULONG_PTR),
+        ]
+
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = [
+            ("wVk", ctypes.c_ushort),
+            ("wScan", ctypes.c_ushort),
+            ("dwFlags", ctypes.c_ulong),
+            ("time", ctypes.c_ulong),
+            ("dwExtraInfo", ULONG_PTR),
+        ]
+
+    class HARDWAREINPUT(ctypes.Structure):
+        _fields_ = [
+            ("uMsg", ctypes.c_ulong),
+            ("wParamL", ctypes.c_ushort),
+            ("wParamH", ctypes.c_ushort),
+        ]
+
+    class INPUT_UNION(ctypes.Union):
+        _fields_ = [
+            ("mi", MOUSEINPUT),
+            ("ki", KEYBDINPUT),
+            ("hi", HARDWAREINPUT),
+        ]
+
+    class INPUT(ctypes.Structure):
+        _fields_ = [
+            ("type", ctypes.c_ulong),
+            ("union", INPUT_UNION),
+        ]
+
+    MOUSE_DOWN_UP = {
+        MOUSE_BUTTONS["mouse_left"]: (MOUSEEVENTF_LEFTDOWN, MOUSEEVENTF_LEFTUP),
+        MOUSE_BUTTONS["mouse_right"]: (MOUSEEVENTF_RIGHTDOWN, MOUSEEVENTF_RIGHTUP),
+        MOUSE_BUTTONS["mouse_middle"]: (MOUSEEVENTF_MIDDLEDOWN, MOUSEEVENTF_MIDDLEUP),
+    }
+
+
+class InjectionBackend:
+    def open(self):
+        pass
+
+    def send(self, op: int, code: int):
+        raise NotImplementedError
+
+    def move(self, x: int, y: int):
+        pass
+
+    def prepare_batch(self, plan: Plan):
+        return tuple((step.op, step.code) for step in plan)
+
+    def send_batch(self, batch):
+        for op, code in batch:
+            self.send(op, code)
+
+    def close(self):
+        pass
+
+
+class NullBackend(InjectionBackend):
+    def send(self, op: int, code: int):
+        pass
+
+
+class SendInputBackend(InjectionBackend):
+    def __init__(self):
+        self._send_input = ctypes.windll.user32.SendInput
+        self._input_size = ctypes.sizeof(INPUT)
+        self._single = {}
+
+    def _fill(self, inp, op: int, code: int):
+        if op == KEY_DOWN or op == KEY_UP:
+            inp.type = INPUT_KEYBOARD
+            inp.union.ki.wVk = code
+            inp.union.ki.dwFlags = KEYEVENTF_KEYUP if op == KEY_UP else 0
+            inp.union.ki.dwExtraInfo = INJECTED_MARKER
+        else:
+            inp.type = INPUT_MOUSE
+            down_up = MOUSE_DOWN_UP[code]
+            inp.union.mi.dwFlags = down_up[0] if op == MOUSE_DOWN else down_up[1]
+            inp.union.mi.dwExtraInfo = INJECTED_MARKER
+
+    def send(self, op: int, code: int):
+        inp = self._single.get((op, code))
+        if inp is None:
+            inp = INPUT()
+            self._fill(inp, op, code)
+            self._single[(op, code)] = inp
+        self._send_input(1, ctypes.byref(inp), self._input_size)
+
+    def prepare_batch(self, plan: Plan):
+        batch = (INPUT * len(plan))()
+        for inp, step in zip(batch, plan):
+            self._fill(inp, step.op, step.code)
+        return batch
+
+    def send_batch(self, batch):
+        self._send_input(len(batch), batch, self._input_size)
+
+    def move(self, x: int, y: int):
+        ctypes.windll.user32.SetCursorPos(x, y)
+
+
+class PynputBackend(InjectionBackend):
+    def __init__(self):
+        self._keyboard = None
+        self._mouse = None
+        self._keys: dict = {}
+        self._buttons: dict = {}
+
+    def open(self):
+        if self._keyboard is not None:
+            return
+        from pynput import keyboard, mouse
+
+        from app.engine.pynput_keys import pynput_buttons_by_code, pynput_keys_by_vk
+
+        self._keys = pynput_keys_by_vk()
+        self._buttons = pynput_buttons_by_code()
+        self._keyboard = keyboard.Controller()
+        self._mouse = mouse.Controller()
+
+    def send(self, op: int, code: int):
+        if op == KEY_DOWN:
+            key = self._keys.get(code)
+            if key is not None:
+                self._keyboard.press(key)
+        elif op == KEY_UP:
+            key = self._keys.get(code)
+            if key is not None:
+                self._keyboard.release(key)
+        elif op == MOUSE_DOWN:
+            self._mouse.press(self._buttons[code])
+        elif op == MOUSE_UP:
+            self._mouse.release(self._buttons[code])
+
+    def move(self, x: int, y: int):
+        self._mouse.position = (x, y)
+
+
+class RecordingBackend(InjectionBackend):
+    def __init__(self, forward_to: InjectionBackend | None = None):
+        self._forward_to = forward_to
+        self._lock = threading.Lock()
+        self.timestamps = array("d")
+        self.ops = array("B")
+        self.codes = array("H")
+
+    def open(self):
+        if self._forward_to is not None:
+            self._forward_to.open()
+
+    def prepare_batch(self, plan: Plan):
+        if self._forward_to is not None:
+            return self._forward_to.prepare_batch(plan), super().prepare_batch(plan)
+        return None, super().prepare_batch(plan)
+
+    def send(self, op: int, code: int):
+        if self._forward_to is not None:
+            self._forward_to.send(op, code)
+        now = time.perf_counter()
+        with self._lock:
+            self.timestamps.append(now)
+            self.ops.append(op)
+            self.codes.append(code)
+
+    def move(self, x: int, y: int):
+        if self._forward_to is not None:
+            self._forward_to.move(x, y)
+        now = time.perf_counter()
+        with self._lock:
+            self.timestamps.append(now)
+            self.ops.append(MOUSE_MOVE)
+            self.codes.append(0)
+
+    def send_batch(self, batch):
+        forwarded, batch = batch
+        if self._forward_to is not None:
+            self._forward_to.send_batch(forwarded)
+        now = time.perf_counter()
+        with self._lock:
+            for op, code in batch:
+                self.timestamps.append(now)
+                self.ops.append(op)
+                self.codes.append(code)
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def events(self) -> list[tuple[float, int, int]]:
+        with self._lock:
+            return list(zip(self.timestamps, self.ops, self.codes))
+
+    def clear(self):
+        with self._lock:
+            del self.timestamps[:]
+            del self.ops[:]
+            del self.codes[:]
+
+
+def default_backend() -> InjectionBackend:
+    if IS_WINDOWS:
+        return SendInputBackend()
+    return PynputBackend()
@@ -0,0 +1,355 @@
+import argparse
+import ctypes
+import json
+import statistics
+import sys
+import time
+
+from app.engine.backends import RecordingBackend, default_backend
+from app.engine.hook_engine import HookEngine
+from app.engine.keys import VK_MAP
+from app.engine.plan import KEY_DOWN, KEY_UP
+from app.engine.timing import PRECISE_SPIN_THRESHOLD, LatencyRecorder, sleep_until
+from app.models.input_event import InputEvent
+from app.models.mapping_item import MappingItem
+
+UNMAPPED_VK = 0x87
+TURBO_CHECK_RATES = (100, 1000)
+TURBO_TOLERANCE = 0.05
+
+
+def _keys(*values: str) -> list[InputEvent]:
+    return [InputEvent.of("keyboard", v) for v in values]
+
+
+def _backend(native: bool) -> RecordingBackend:
+    return RecordingBackend(forward_to=default_backend() if native else None)
+
+
+def bench_macro(triggers: int = 200, precise: bool = False, native: bool = False) -> dict:
+    backend = _backend(native)
+    engine = HookEngine(backend=backend, precise_timing=precise)
+    mapping = MappingItem(source=_keys("f1")[0], target=_keys("shift", "a"), batched=True)
+    engine.start([mapping], install_hooks=False)
+
+    plan = [(step.op, step.code) for step in engine.compiled_plan(mapping.id)]
+    latencies = []
+    for _ in range(triggers):
+        before = len(backend)
+        sent_at = time.perf_counter()
+        engine.trigger(mapping.id)
+        while len(backend) == before:
+            time.sleep(0)
+        latencies.append(backend.timestamps[before] - sent_at)
+    deadline = time.perf_counter() + 1.0
+    while len(backend) < triggers * len(plan) and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    engine.stop()
+
+    emitted = [(op, code) for _, op, code in backend.events()]
+    return {
+        "triggers": triggers,
+        "events": len(emitted),
+        "ordered": emitted == plan * triggers,
+        "latency_mean_us": statistics.fmean(latencies) * 1e6,
+        "latency_max_us": max(latencies) * 1e6,
+    }
+
+
+def bench_direct(presses: int = 2000, native: bool = False) -> dict:
+    backend = _backend(native)
+    engine = HookEngine(backend=backend)
+    mapping = MappingItem(source=_keys("f3")[0], target=_keys("b"), direct=True)
+    engine.start([mapping], install_hooks=False)
+
+    source = VK_MAP["f3"]
+    down = LatencyRecorder(presses)
+    up = LatencyRecorder(presses)
+    for _ in range(presses):
+        start = time.perf_counter_ns()
+        engine._handle_key(source, True, start)
+        down.record(time.perf_counter_ns() - start)
+        start = time.perf_counter_ns()
+        engine._handle_key(source, False, start)
+        up.record(time.perf_counter_ns() - start)
+    engine.stop()
+
+    emitted = [(op, code) for _, op, code in backend.events()]
+    expected = [(KEY_DOWN, VK_MAP["b"]), (KEY_UP, VK_MAP["b"])] * presses
+    return {
+        "presses": presses,
+        "ordered": emitted == expected,
+        "down": down.to_dict(),
+        "up": up.to_dict(),
+    }
+
+
+def bench_turbo(
+    seconds: float = 1.0, precise: bool = False, native: bool = False, turbo_hz: int = 1000
+) -> dict:
+    backend = _backend(native)
+    engine = HookEngine(backend=backend, precise_timing=precise)
+    mapping = MappingItem(
+        source=_keys("f2")[0], target=_keys("a"), turbo=True, loop=True, turbo_hz=turbo_hz
+    )
+    engine.start([mapping], install_hooks=False)
+    engine.trigger(mapping.id)
+    time.sleep(seconds)
+    engine.stop()
+
+    presses = sum(1 for op in backend.ops if op == KEY_DOWN) / seconds
+    result = {
+        "turbo_hz": mapping.turbo_hz,
+        "events_per_second": len(backend) / seconds,
+        "presses_per_second": presses,
+        "achieved_ratio": presses / mapping.turbo_hz,
+    }
+    result.update(engine.loop_timing(mapping.id).to_dict())
+    return result
+
+
+def check_turbo(seconds: float = 1.0, precise: bool = False) -> tuple[dict, bool]:
+    results = {}
+    passed = True
+    for rate in TURBO_CHECK_RATES:
+        result = results[f"{rate}_hz"] = bench_turbo(seconds, precise, turbo_hz=rate)
+        result["within_tolerance"] = abs(result["achieved_ratio"] - 1) <= TURBO_TOLERANCE
+        passed = passed and result["within_tolerance"]
+    return results, passed
+
+
+def _move_cpu(seconds: float, rate: int) -> dict:
+    from pynput import mouse
+
+    controller = mouse.Controller()
+    period = 1.0 / rate
+    moves = int(seconds * rate)
+    cpu = time.process_time()
+    started = deadline = time.perf_counter()
+    for index in range(moves):
+        controller.move(1 if index % 2 else -1, 0)
+        deadline += period
+        sleep_until(deadline, PRECISE_SPIN_THRESHOLD)
+    elapsed = time.perf_counter() - started
+    return {
+        "moves_per_second": moves / elapsed,
+        "cpu_percent": (time.process_time() - cpu) / elapsed * 100,
+    }
+
+
+def bench_mouse(seconds: float = 2.0, rate: int = 1000) -> dict:
+    from pynput import mouse
+
+    results = {"no_listener": _move_cpu(seconds, rate)}
+
+    engine = HookEngine(backend=RecordingBackend())
+    engine._load_pynput()
+    listener = mouse.Listener(on_click=engine._on_mouse_click)
+    listener.start()
+    listener.wait()
+    results["click_listener"] = _move_cpu(seconds, rate)
+    listener.stop()
+
+    mapping = MappingItem(source=InputEvent.of("mouse", "mouse_middle"), target=_keys("a"))
+    engine.start([mapping])
+    engine._mouse_listener.wait()
+    results["filtered_listener"] = _move_cpu(seconds, rate)
+    engine.stop()
+    return results
+
+
+class _Point(ctypes.Structure):
+    _fields_ = [("x", ctypes.c_long), ("y", ctypes.c_long)]
+
+
+class _MouseHookData(ctypes.Structure):
+    _fields_ = [
+        ("pt", _Point),
+        ("mouseData", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("time", ctypes.c_uint32),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+def _per_event_ns(fn, events: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(events):
+        fn()
+    return (time.perf_counter_ns() - start) / events
+
+
+def bench_mouse_filter(events: int = 200_000) -> dict:
+    from pynput.mouse import Button
+
+    engine = HookEngine(backend=RecordingBackend())
+    mapping = MappingItem(source=InputEvent.of("mouse", "mouse_middle"), target=_keys("a"))
+    engine.start([mapping], install_hooks=False)
+    engine._load_pynput()
+    data = _MouseHookData(_Point(100, 200))
+    move = HookEngine.WM_MOUSEMOVE
+    left_down, left_up = 0x0201, 0x0202
+
+    def filtered_click():
+        engine._win32_mouse_filter(left_down, data)
+        engine._win32_mouse_filter(left_up, data)
+
+    def callback_click():
+        engine._on_mouse_click(100, 200, Button.left, True)
+        engine._on_mouse_click(100, 200, Button.left, False)
+
+    results = {
+        "move_filtered_ns": _per_event_ns(lambda: engine._win32_mouse_filter(move, data), events),
+        "click_filtered_ns": _per_event_ns(filtered_click, events // 2) / 2,
+        "click_callback_ns": _per_event_ns(callback_click, events // 2) / 2,
+    }
+    engine.start_recording()
+    results["move_filtered_recording_ns"] = _per_event_ns(
+        lambda: engine._win32_mouse_filter(move, data), events
+    )
+    results["move_callback_recording_ns"] = _per_event_ns(
+        lambda: engine._on_mouse_move(100, 200), events
+    )
+    engine.stop_recording()
+    engine.stop()
+    results["move_filtered_cpu_percent_at_1khz"] = results["move_filtered_ns"] * 1000 / 1e7
+    return results
+
+
+def bench_key_gate(events: int = 200_000) -> dict:
+    from pynput.keyboard import KeyCode
+
+    from app.engine.win32_hook import KBDLLHOOKSTRUCT, LLKHF_UP, dispatch_hook_data
+
+    engine = HookEngine(backend=RecordingBackend())
+    engine.start([MappingItem(source=_keys("f1")[0], target=_keys("a"))], install_hooks=False)
+    engine._load_pynput()
+    unmapped = KBDLLHOOKSTRUCT(vkCode=UNMAPPED_VK)
+    unmapped_up = KBDLLHOOKSTRUCT(vkCode=UNMAPPED_VK, flags=LLKHF_UP)
+    modifier = KBDLLHOOKSTRUCT(vkCode=VK_MAP["shift"])
+    modifier_up = KBDLLHOOKSTRUCT(vkCode=VK_MAP["shift"], flags=LLKHF_UP)
+    key = KeyCode.from_vk(UNMAPPED_VK)
+
+    def native(down, up):
+        down, up = ctypes.addressof(down), ctypes.addressof(up)
+        return lambda: (
+            dispatch_hook_data(engine._native_key, down),
+            dispatch_hook_data(engine._native_key, up),
+        )
+
+    def pynput_filter():
+        engine._win32_filter(HookEngine.WM_KEYDOWN, unmapped)
+        engine._win32_filter(0x0101, unmapped_up)
+
+    def pynput_translate():
+        engine._on_pynput_key(key, True, False)
+        engine._on_pynput_key(key, False, False)
+
+    results = {
+        "native_unmapped_ns": _per_event_ns(native(unmapped, unmapped_up), events // 2) / 2,
+        "native_modifier_ns": _per_event_ns(native(modifier, modifier_up), events // 2) / 2,
+        "pynput_filter_unmapped_ns": _per_event_ns(pynput_filter, events // 2) / 2,
+        "pynput_callback_unmapped_ns": _per_event_ns(pynput_translate, events // 2) / 2,
+    }
+    engine.stop()
+    return results
+
+
+def _keystroke_cpu(events: int) -> dict:
+    from pynput.keyboard import Controller, KeyCode
+
+    controller = Controller()
+    key = KeyCode.from_vk(UNMAPPED_VK)
+    cpu = time.process_time()
+    started = time.perf_counter()
+    for _ in range(events // 2):
+        controller.press(key)
+        controller.release(key)
+    time.sleep(0.2)
+    return {
+        "cpu_us_per_event": (time.process_time() - cpu) / events * 1e6,
+        "wall_s": time.perf_counter() - started,
+    }
+
+
+def bench_keyboard_hook(events: int = 20_000) -> dict:
+    results = {"no_hook": _keystroke_cpu(events)}
+    mapping = MappingItem(source=_keys("f1")[0], target=_keys("a"))
+    for name, native in (("pynput", False), ("native", True)):
+        engine = HookEngine(backend=RecordingBackend(), native_hook=native)
+        engine.start([mapping])
+        time.sleep(0.2)
+        result = results[name] = _keystroke_cpu(events)
+        result["cpu_us_over_baseline"] = (
+            result["cpu_us_per_event"] - results["no_hook"]["cpu_us_per_event"]
+        )
+        result["callback"] = engine.callback_timing()["keyboard"]
+        engine.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HookEngine macro benchmark")
+    parser.add_argument("--triggers", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--precise", action="store_true")
+    parser.add_argument("--turbo-hz", type=int, default=1000)
+    parser.add_argument(
+        "--native",
+        action="store_true",
+        help="also inject through the platform backend (sends real input)",
+    )
+    parser.add_argument(
+        "--mouse",
+        action="store_true",
+        help="measure listener CPU under 1 kHz mouse movement (moves the real cursor)",
+    )
+    parser.add_argument(
+        "--keyboard-hook",
+        action="store_true",
+        help="compare the pynput and native keyboard hooks (Windows, sends F24 keystrokes)",
+    )
+    parser.add_argument(
+        "--mouse-filter",
+        action="store_true",
+        help="time the engine's raw mouse filter in-process (no real input)",
+    )
+    parser.add_argument(
+        "--key-gate",
+        action="store_true",
+        help="time the native hook's key gate against the pynput entry points in-process",
+    )
+    parser.add_argument(
+        "--check-turbo",
+        action="store_true",
+        help="exit non-zero unless turbo at 100 and 1000 Hz hits the configured rate",
+    )
+    args = parser.parse_args()
+
+    if args.check_turbo:
+        results, passed = check_turbo(args.seconds, args.precise)
+        print(json.dumps(results, indent=2))
+        sys.exit(0 if passed else 1)
+    if args.key_gate:
+        print(json.dumps(bench_key_gate(), indent=2))
+        return
+    if args.mouse_filter:
+        print(json.dumps(bench_mouse_filter(), indent=2))
+        return
+    if args.keyboard_hook:
+        print(json.dumps(bench_keyboard_hook(args.triggers * 100), indent=2))
+        return
+    if args.mouse:
+        print(json.dumps(bench_mouse(args.seconds * 2), indent=2))
+        return
+
+    results = {
+        "macro": bench_macro(args.triggers, args.precise, args.native),
+        "direct": bench_direct(args.triggers * 10, args.native),
+        "turbo": bench_turbo(args.seconds, args.precise, args.native, args.turbo_hz),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
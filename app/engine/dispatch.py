@@ -0,0 +1,169 @@
+import copy
+from typing import Callable, NamedTuple
+
+from app.engine.backends import InjectionBackend
+from app.engine.keys import ALL_MODIFIER_MASKS, VK_MAP, modifier_mask
+from app.engine.metrics import EngineMetrics, MappingMetrics
+from app.engine.plan import Plan, compile_direct, compile_plan
+from app.engine.recorder import MACRO_EVENT, Recording
+from app.models.mapping_item import MappingItem
+
+VK_VARIANTS = {
+    0x10: [0xA0, 0xA1],
+    0x11: [0xA2, 0xA3],
+    0x12: [0xA4, 0xA5],
+    0x5B: [0x5C],
+}
+
+
+def keyboard_chords(value: str, modifiers: list[str]) -> list[tuple[int, int]]:
+    vk = VK_MAP.get(value)
+    if not vk:
+        return []
+    mask = modifier_mask(modifiers)
+    masks = (mask,) if mask else ALL_MODIFIER_MASKS
+    return [(code, mk) for code in (vk, *VK_VARIANTS.get(vk, [])) for mk in masks]
+
+
+class DirectRemap(NamedTuple):
+    mapping_id: str
+    down: object
+    up: object
+    edges: int
+    metrics: MappingMetrics
+
+
+def mapping_signature(mapping: MappingItem) -> str:
+    return repr(mapping.to_dict())
+
+
+class DispatchTables:
+    __slots__ = (
+        "mapping_by_id",
+        "signatures",
+        "plans",
+        "batches",
+        "recordings",
+        "metrics",
+        "key_dispatch",
+        "direct_dispatch",
+        "mouse_dispatch",
+        "stop_vk",
+        "stop_mouse",
+        "hooked_vks",
+        "need_keyboard",
+        "need_mouse",
+    )
+
+    def __init__(self):
+        self.mapping_by_id: dict[str, MappingItem] = {}
+        self.signatures: dict[str, str] = {}
+        self.plans: dict[str, Plan] = {}
+        self.batches: dict[str, object] = {}
+        self.recordings: dict[str, Recording] = {}
+        self.metrics: dict[str, MappingMetrics] = {}
+        self.key_dispatch: dict[tuple[int, int], MappingItem] = {}
+        self.direct_dispatch: dict[tuple[int, int], DirectRemap] = {}
+        self.mouse_dispatch: dict[tuple[str, int], MappingItem] = {}
+        self.stop_vk: dict[int, str] = {}
+        self.stop_mouse: dict[str, str] = {}
+        self.hooked_vks: set[int] = set()
+        self.need_keyboard = False
+        self.need_mouse = False
+
+    def changed_ids(self, newer: "DispatchTables") -> list[str]:
+        return [
+            mapping_id
+            for mapping_id, signature in self.signatures.items()
+            if newer.signatures.get(mapping_id) != signature
+        ]
+
+    def _register_direct(self, m: MappingItem, backend: InjectionBackend) -> bool:
+        down, up = compile_direct(m)
+        if not down:
+            return False
+        chords = keyboard_chords(m.source.value, m.source_modifiers)
+        remap = DirectRemap(
+            m.id,
+            backend.prepare_batch(down),
+            backend.prepare_batch(up),
+            len(down),
+            self.metrics[m.id],
+        )
+        for chord in chords:
+            self.key_dispatch.pop(chord, None)
+            self.direct_dispatch[chord] = remap
+        return bool(chords)
+
+    def _register_source(self, m: MappingItem):
+        if m.source.event_type == "keyboard":
+            for chord in keyboard_chords(m.source.value, m.source_modifiers):
+                self.direct_dispatch.pop(chord, None)
+                self.key_dispatch[chord] = m
+        elif m.source.event_type == "mouse":
+            mask = modifier_mask(m.source_modifiers)
+            masks = (mask,) if mask else ALL_MODIFIER_MASKS
+            for mk in masks:
+                self.mouse_dispatch[(m.source.value, mk)] = m
+
+    def _register_stop(self, m: MappingItem):
+        if m.stop_key.event_type == "keyboard":
+            vk = VK_MAP.get(m.stop_key.value)
+            if vk:
+                for code in (vk, *VK_VARIANTS.get(vk, [])):
+                    self.stop_vk[code] = m.id
+        elif m.stop_key.event_type == "mouse":
+            self.stop_mouse[m.stop_key.value] = m.id
+
+
+def compile_tables(
+    mappings: list[MappingItem],
+    backend: InjectionBackend,
+    metrics: EngineMetrics,
+    previous: DispatchTables | None = None,
+    load_recording: Callable[[str], Recording | None] | None = None,
+) -> DispatchTables:
+    tables = DispatchTables()
+    enabled = [copy.copy(m) for m in mappings if m.enabled]
+
+    for m in enabled:
+        signature = mapping_signature(m)
+        tables.mapping_by_id[m.id] = m
+        tables.signatures[m.id] = signature
+        tables.metrics[m.id] = metrics.register(m.id, m.source_display_name())
+        macro = next((t for t in m.target if t.event_type == MACRO_EVENT), None)
+        if macro is not None and load_recording is not None:
+            recording = load_recording(macro.value)
+            if recording is not None:
+                tables.recordings[m.id] = recording
+        if previous is not None and previous.signatures.get(m.id) == signature:
+            tables.plans[m.id] = previous.plans[m.id]
+            if m.id in previous.batches:
+                tables.batches[m.id] = previous.batches[m.id]
+            continue
+        plan = tables.plans[m.id] = compile_plan(m)
+        if m.batched and plan:
+            tables.batches[m.id] = backend.prepare_batch(plan)
+
+    for m in sorted(enabled, key=lambda item: bool(item.source_modifiers)):
+        direct = m.direct and m.source.event_type == "keyboard"
+        if not direct or not tables._register_direct(m, backend):
+            tables._register_source(m)
+        if m.stop_key:
+            tables._register_stop(m)
+
+    tables.hooked_vks = {
+        *(vk for vk, _ in tables.key_dispatch),
+        *(vk for vk, _ in tables.direct_dispatch),
+        *tables.stop_vk,
+    }
+
+    mouse_chords = any(m.source_modifiers for m in enabled if m.source.event_type == "mouse")
+    tables.need_keyboard = (
+        bool(tables.key_dispatch)
+        or bool(tables.direct_dispatch)
+        or bool(tables.stop_vk)
+        or mouse_chords
+    )
+    tables.need_mouse = bool(tables.mouse_dispatch) or bool(tables.stop_mouse)
+    return tables
@@ -0,0 +1,288 @@
+import ctypes
+import ntpath
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+from app.engine.backends import IS_MACOS, IS_WINDOWS
+
+if TYPE_CHECKING:
+    from app.engine.hook_engine import HookEngine
+
+if IS_WINDOWS:
+    from ctypes import wintypes
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    WM_QUIT = 0x0012
+
+    WINEVENTPROC = ctypes.WINFUNCTYPE(
+        None,
+        wintypes.HANDLE,
+        wintypes.DWORD,
+        wintypes.HWND,
+        wintypes.LONG,
+        wintypes.LONG,
+        wintypes.DWORD,
+        wintypes.DWORD,
+    )
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    user32.SetWinEventHook.restype = wintypes.HANDLE
+    user32.SetWinEventHook.argtypes = [
+        wintypes.DWORD,
+        wintypes.DWORD,
+        wintypes.HMODULE,
+        WINEVENTPROC,
+        wintypes.DWORD,
+        wintypes.DWORD,
+        wintypes.DWORD,
+    ]
+    user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+    user32.GetForegroundWindow.restype = wintypes.HWND
+    user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+    user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+    user32.PostThreadMessageW.argtypes = [
+        wintypes.DWORD,
+        wintypes.UINT,
+        wintypes.WPARAM,
+        wintypes.LPARAM,
+    ]
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+    kernel32.QueryFullProcessImageNameW.argtypes = [
+        wintypes.HANDLE,
+        wintypes.DWORD,
+        wintypes.LPWSTR,
+        ctypes.POINTER(wintypes.DWORD),
+    ]
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+PROCESS_CACHE_SIZE = 256
+RUN_LOOP_SLICE = 0.1
+
+ForegroundCallback = Callable[[str], None]
+
+
+def normalize_process_name(name: str) -> str:
+    return name.strip().lower()
+
+
+class ForegroundTracker:
+    def __init__(self, on_change: ForegroundCallback):
+        self._on_change = on_change
+        self._current = ""
+
+    @property
+    def current(self) -> str:
+        return self._current
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def _emit(self, process_name: str):
+        process_name = normalize_process_name(process_name)
+        if process_name and process_name != self._current:
+            self._current = process_name
+            self._on_change(process_name)
+
+
+class FakeForegroundTracker(ForegroundTracker):
+    def activate(self, process_name: str):
+        self._emit(process_name)
+
+
+class WinEventForegroundTracker(ForegroundTracker):
+    def __init__(self, on_change: ForegroundCallback):
+        super().__init__(on_change)
+        self._thread: threading.Thread | None = None
+        self._thread_id = 0
+        self._ready = threading.Event()
+        self._names: dict[int, tuple[int, str]] = {}
+        self._proc = WINEVENTPROC(self._on_win_event)
+
+    def start(self):
+        if self._thread:
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name="foreground-tracker", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=1.0)
+
+    def stop(self):
+        if self._thread:
+            user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        self._thread_id = kernel32.GetCurrentThreadId()
+        hook = user32.SetWinEventHook(
+            EVENT_SYSTEM_FOREGROUND,
+            EVENT_SYSTEM_FOREGROUND,
+            None,
+            self._proc,
+            0,
+            0,
+            WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS,
+        )
+        self._ready.set()
+        self._resolve(user32.GetForegroundWindow())
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        if hook:
+            user32.UnhookWinEvent(hook)
+
+    def _on_win_event(self, hook, event, hwnd, id_object, id_child, thread_id, timestamp):
+        self._resolve(hwnd)
+
+    def _resolve(self, hwnd):
+        if not hwnd:
+            return
+        pid = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        cached = self._names.get(hwnd)
+        if cached is not None and cached[0] == pid.value:
+            self._emit(cached[1])
+            return
+        name = self._process_name(pid.value)
+        if len(self._names) >= PROCESS_CACHE_SIZE:
+            self._names.clear()
+        self._names[hwnd] = (pid.value, name)
+        self._emit(name)
+
+    def _process_name(self, pid: int) -> str:
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return ""
+        try:
+            size = wintypes.DWORD(260)
+            buffer = ctypes.create_unicode_buffer(size.value)
+            if not kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+                return ""
+            return ntpath.basename(buffer.value)
+        finally:
+            kernel32.CloseHandle(handle)
+
+
+class NSWorkspaceForegroundTracker(ForegroundTracker):
+    def __init__(self, on_change: ForegroundCallback):
+        super().__init__(on_change)
+        self._observer = None
+        self._names: dict[int, str] = {}
+
+    def start(self):
+        if self._observer is not None:
+            return
+        import AppKit
+
+        workspace = AppKit.NSWorkspace.sharedWorkspace()
+        center = workspace.notificationCenter()
+        self._observer = center.addObserverForName_object_queue_usingBlock_(
+            AppKit.NSWorkspaceDidActivateApplicationNotification,
+            None,
+            None,
+            lambda notification: self._resolve(
+                notification.userInfo()[AppKit.NSWorkspaceApplicationKey]
+            ),
+        )
+        self._resolve(workspace.frontmostApplication())
+
+    def stop(self):
+        if self._observer is not None:
+            import AppKit
+
+            center = AppKit.NSWorkspace.sharedWorkspace().notificationCenter()
+            center.removeObserver_(self._observer)
+            self._observer = None
+
+    def _resolve(self, app):
+        if app is None:
+            return
+        pid = app.processIdentifier()
+        name = self._names.get(pid)
+        if name is None:
+            url = app.executableURL()
+            name = str(url.lastPathComponent()) if url else str(app.localizedName() or "")
+            if len(self._names) >= PROCESS_CACHE_SIZE:
+                self._names.clear()
+            self._names[pid] = name
+        self._emit(name)
+
+
+def wait_pumping_events(event: threading.Event, timeout: float) -> bool:
+    if not IS_MACOS:
+        return event.wait(timeout)
+    import AppKit
+
+    run_loop = AppKit.NSRunLoop.currentRunLoop()
+    deadline = time.monotonic() + timeout
+    while not event.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        until = AppKit.NSDate.dateWithTimeIntervalSinceNow_(min(remaining, RUN_LOOP_SLICE))
+        if not run_loop.runMode_beforeDate_(AppKit.NSDefaultRunLoopMode, until):
+            event.wait(min(remaining, RUN_LOOP_SLICE))
+    return event.is_set()
+
+
+def default_tracker(on_change: ForegroundCallback) -> ForegroundTracker:
+    if IS_WINDOWS:
+        return WinEventForegroundTracker(on_change)
+    if IS_MACOS:
+        return NSWorkspaceForegroundTracker(on_change)
+    return FakeForegroundTracker(on_change)
+
+
+class AppProfileSwitcher:
+    def __init__(
+        self,
+        engine: "HookEngine",
+        tracker_factory: Callable[[ForegroundCallback], ForegroundTracker] = default_tracker,
+    ):
+        self._engine = engine
+        self._rules: dict[str, str] = {}
+        self._fallback = ""
+        self._tracker = tracker_factory(self._on_foreground)
+        self._running = False
+
+    @property
+    def tracker(self) -> ForegroundTracker:
+        return self._tracker
+
+    def set_rules(self, rules: dict[str, str], fallback: str | None = None):
+        self._rules = {normalize_process_name(k): v for k, v in rules.items()}
+        if fallback is not None:
+            self._fallback = fallback
+        if self._running and not self._rules:
+            self.stop()
+        elif self._running and self._tracker.current:
+            self._on_foreground(self._tracker.current)
+
+    def set_fallback(self, fallback: str):
+        self._fallback = fallback
+
+    def start(self):
+        if self._running or not self._rules:
+            return
+        self._running = True
+        self._tracker.start()
+
+    def stop(self):
+        if self._running:
+            self._tracker.stop()
+            self._running = False
+
+    def _on_foreground(self, process_name: str):
+        profile = self._rules.get(process_name, self._fallback)
+        if profile and profile != self._engine.active_profile:
+            self._engine.switch_profile(profile, notify=True)
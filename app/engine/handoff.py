@@ -0,0 +1,37 @@
+import threading
+
+DEFAULT_CAPACITY = 1024
+
+
+class HandoffQueue:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._capacity = capacity
+        self._slots: list = [None] * capacity
+        self._head = 0
+        self._tail = 0
+        self._ready = threading.Semaphore(0)
+        self._put_lock = threading.Lock()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    def put(self, item) -> bool:
+        with self._put_lock:
+            tail = self._tail
+            if tail - self._head >= self._capacity:
+                self.dropped += 1
+                return False
+            self._slots[tail % self._capacity] = item
+            self._tail = tail + 1
+        self._ready.release()
+        return True
+
+    def get(self, timeout: float | None = None):
+        if not self._ready.acquire(timeout=timeout):
+            return None
+        index = self._head % self._capacity
+        item = self._slots[index]
+        self._slots[index] = None
+        self._head += 1
+        return item
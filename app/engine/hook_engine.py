@@ -1,398 +1,796 @@
 import ctypes
-import ctypes.wintypes
-import platform
+import os
 import threading
 import time
+from typing import TYPE_CHECKING, Callable
+
+from app.engine.backends import (
+    INJECTED_MARKER,
+    IS_MACOS,
+    IS_WINDOWS,
+    InjectionBackend,
+    default_backend,
+)
+from app.engine.dispatch import DirectRemap, DispatchTables, compile_tables, keyboard_chords
+from app.engine.handoff import HandoffQueue
+from app.engine.keys import (
+    MAC_KEYCODE_TO_VK,
+    MAC_MODIFIER_FLAGS,
+    MOUSE_BUTTONS,
+    SIDE_STATE_TO_MASK,
+    VK_MAP,
+    VK_MODIFIER_SIDES,
+)
+from app.engine.metrics import EngineMetrics, MappingMetrics
+from app.engine.plan import (
+    KEY_DOWN,
+    MOUSE_DOWN,
+    MOUSE_MOVE,
+    MOUSE_UP,
+    Plan,
+    loop_delay,
+    plan_duration,
+)
+from app.engine.recorder import Recording
+from app.engine.scheduler import MacroScheduler, MacroSteps
+from app.engine.timing import PRECISE_SPIN_THRESHOLD, LatencyRecorder, LoopTimingStats
+from app.models.mapping_item import (
+    TRIGGER_COALESCE,
+    TRIGGER_DROP,
+    TRIGGER_ONCE,
+    TRIGGER_QUEUE,
+    TRIGGER_REPEAT,
+    TRIGGER_RESTART,
+    MappingItem,
+)
+
+if TYPE_CHECKING:
+    from pynput import keyboard, mouse
+
+    from app.engine.win32_hook import LowLevelKeyboardHook
+
+HANDOFF_TRIGGER = 0
+HANDOFF_STOP = 1
+HANDOFF_MOUSE_STOP = 2
+HANDOFF_PROFILE = 3
+HANDOFF_PROFILE_KEY = 4
+
+MAX_QUEUED_TRIGGERS = 4
+PENDING_LIMITS = {TRIGGER_DROP: 0, TRIGGER_COALESCE: 1, TRIGGER_QUEUE: MAX_QUEUED_TRIGGERS}
+
+
+class TriggerRun:
+    __slots__ = ("pending",)
 
-from pynput import keyboard, mouse
-from pynput.keyboard import Key, KeyCode
-from pynput.mouse import Button
-
-from app.models.mapping_item import MappingItem
-
-IS_WINDOWS = platform.system() == "Windows"
-
-if IS_WINDOWS:
-    INPUT_KEYBOARD = 1
-    INPUT_MOUSE = 0
-    KEYEVENTF_KEYUP = 0x0002
-    MOUSEEVENTF_LEFTDOWN = 0x0002
-    MOUSEEVENTF_LEFTUP = 0x0004
-    MOUSEEVENTF_RIGHTDOWN = 0x0008
-    MOUSEEVENTF_RIGHTUP = 0x0010
-    MOUSEEVENTF_MIDDLEDOWN = 0x0020
-    MOUSEEVENTF_MIDDLEUP = 0x0040
-
-    ULONG_PTR = ctypes.c_ulonglong if ctypes.sizeof(ctypes.c_void_p) == 8 else ctypes.c_ulong
-    INJECTED_MARKER = 0xDEAD
-
-    class MOUSEINPUT(ctypes.Structure):
-        _fields_ = [
-            ("dx", ctypes.c_long),
-            ("dy", ctypes.c_long),
-            ("mouseData", ctypes.c_ulong),
-            ("dwFlags", ctypes.c_ulong),
-            ("time", ctypes.c_ulong),
-            ("dwExtraInfo", ULONG_PTR),
-        ]
-
-    class KEYBDINPUT(ctypes.Structure):
-        _fields_ = [
-            ("wVk", ctypes.c_ushort),
-            ("wScan", ctypes.c_ushort),
-            ("dwFlags", ctypes.c_ulong),
-            ("time", ctypes.c_ulong),
-            ("dwExtraInfo", ULONG_PTR),
-        ]
-
-    class HARDWAREINPUT(ctypes.Structure):
-        _fields_ = [
-            ("uMsg", ctypes.c_ulong),
-            ("wParamL", ctypes.c_ushort),
-            ("wParamH", ctypes.c_ushort),
-        ]
-
-    class INPUT_UNION(ctypes.Union):
-        _fields_ = [
-            ("mi", MOUSEINPUT),
-            ("ki", KEYBDINPUT),
-            ("hi", HARDWAREINPUT),
-        ]
-
-    class INPUT(ctypes.Structure):
-        _fields_ = [
-            ("type", ctypes.c_ulong),
-            ("union", INPUT_UNION),
-        ]
-
-    def _send_key_event(vk: int, key_up: bool = False):
-        inp = INPUT()
-        inp.type = INPUT_KEYBOARD
-        inp.union.ki.wVk = vk
-        inp.union.ki.dwFlags = KEYEVENTF_KEYUP if key_up else 0
-        inp.union.ki.dwExtraInfo = INJECTED_MARKER
-        ctypes.windll.user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(INPUT))
-
-    def _send_mouse_event(flags: int):
-        inp = INPUT()
-        inp.type = INPUT_MOUSE
-        inp.union.mi.dwFlags = flags
-        inp.union.mi.dwExtraInfo = INJECTED_MARKER
-        ctypes.windll.user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(INPUT))
-
-VK_MAP = {
-    "a": 0x41, "b": 0x42, "c": 0x43, "d": 0x44, "e": 0x45,
-    "f": 0x46, "g": 0x47, "h": 0x48, "i": 0x49, "j": 0x4A,
-    "k": 0x4B, "l": 0x4C, "m": 0x4D, "n": 0x4E, "o": 0x4F,
-    "p": 0x50, "q": 0x51, "r": 0x52, "s": 0x53, "t": 0x54,
-    "u": 0x55, "v": 0x56, "w": 0x57, "x": 0x58, "y": 0x59, "z": 0x5A,
-    "0": 0x30, "1": 0x31, "2": 0x32, "3": 0x33, "4": 0x34,
-    "5": 0x35, "6": 0x36, "7": 0x37, "8": 0x38, "9": 0x39,
-    "f1": 0x70, "f2": 0x71, "f3": 0x72, "f4": 0x73,
-    "f5": 0x74, "f6": 0x75, "f7": 0x76, "f8": 0x77,
-    "f9": 0x78, "f10": 0x79, "f11": 0x7A, "f12": 0x7B,
-    "escape": 0x1B, "tab": 0x09, "backspace": 0x08,
-    "enter": 0x0D, "space": 0x20, "delete": 0x2E, "insert": 0x2D,
-    "home": 0x24, "end": 0x23, "page_up": 0x21, "page_down": 0x22,
-    "up": 0x26, "down": 0x28, "left": 0x25, "right": 0x27,
-    "shift": 0x10, "ctrl": 0x11, "alt": 0x12, "meta": 0x5B,
-    "caps_lock": 0x14, "num_lock": 0x90, "scroll_lock": 0x91,
-    "print_screen": 0x2C, "pause": 0x13,
-    "minus": 0xBD, "equal": 0xBB,
-    "bracket_left": 0xDB, "bracket_right": 0xDD,
-    "backslash": 0xDC, "semicolon": 0xBA, "apostrophe": 0xDE,
-    "comma": 0xBC, "period": 0xBE, "slash": 0xBF, "grave": 0xC0,
-    "num_0": 0x60, "num_1": 0x61, "num_2": 0x62, "num_3": 0x63,
-    "num_4": 0x64, "num_5": 0x65, "num_6": 0x66, "num_7": 0x67,
-    "num_8": 0x68, "num_9": 0x69,
-    "num_multiply": 0x6A, "num_plus": 0x6B, "num_minus": 0x6D,
-    "num_decimal": 0x6E, "num_divide": 0x6F, "num_enter": 0x0D,
-}
-
-MOUSE_DOWN_UP = {
-    "mouse_left": (MOUSEEVENTF_LEFTDOWN, MOUSEEVENTF_LEFTUP) if IS_WINDOWS else (None, None),
-    "mouse_right": (MOUSEEVENTF_RIGHTDOWN, MOUSEEVENTF_RIGHTUP) if IS_WINDOWS else (None, None),
-    "mouse_middle": (MOUSEEVENTF_MIDDLEDOWN, MOUSEEVENTF_MIDDLEUP) if IS_WINDOWS else (None, None),
-}
-
-PYNPUT_KEY_MAP = {
-    "escape": Key.esc, "tab": Key.tab, "backspace": Key.backspace,
-    "enter": Key.enter, "space": Key.space, "delete": Key.delete,
-    "insert": Key.insert, "home": Key.home, "end": Key.end,
-    "page_up": Key.page_up, "page_down": Key.page_down,
-    "up": Key.up, "down": Key.down, "left": Key.left, "right": Key.right,
-    "shift": Key.shift, "ctrl": Key.ctrl, "alt": Key.alt, "meta": Key.cmd,
-    "caps_lock": Key.caps_lock, "num_lock": Key.num_lock,
-    "scroll_lock": Key.scroll_lock,
-    "f1": Key.f1, "f2": Key.f2, "f3": Key.f3, "f4": Key.f4,
-    "f5": Key.f5, "f6": Key.f6, "f7": Key.f7, "f8": Key.f8,
-    "f9": Key.f9, "f10": Key.f10, "f11": Key.f11, "f12": Key.f12,
-}
-
-
-def _value_to_pynput_key(value: str):
-    if value in PYNPUT_KEY_MAP:
-        return PYNPUT_KEY_MAP[value]
-    if value.startswith("num_") and len(value) == 5 and value[4].isdigit():
-        return KeyCode.from_vk(96 + int(value[4]))
-    if len(value) == 1:
-        return KeyCode.from_char(value)
-    return None
-
-
-def _normalize_key(key) -> str | None:
-    if isinstance(key, Key):
-        name_map = {
-            Key.esc: "escape", Key.tab: "tab", Key.backspace: "backspace",
-            Key.enter: "enter", Key.space: "space", Key.delete: "delete",
-            Key.insert: "insert", Key.home: "home", Key.end: "end",
-            Key.page_up: "page_up", Key.page_down: "page_down",
-            Key.up: "up", Key.down: "down", Key.left: "left", Key.right: "right",
-            Key.shift: "shift", Key.shift_l: "shift", Key.shift_r: "shift",
-            Key.ctrl: "ctrl", Key.ctrl_l: "ctrl", Key.ctrl_r: "ctrl",
-            Key.alt: "alt", Key.alt_l: "alt", Key.alt_r: "alt",
-            Key.cmd: "meta", Key.cmd_l: "meta", Key.cmd_r: "meta",
-            Key.caps_lock: "caps_lock", Key.num_lock: "num_lock",
-            Key.scroll_lock: "scroll_lock",
-            Key.f1: "f1", Key.f2: "f2", Key.f3: "f3", Key.f4: "f4",
-            Key.f5: "f5", Key.f6: "f6", Key.f7: "f7", Key.f8: "f8",
-            Key.f9: "f9", Key.f10: "f10", Key.f11: "f11", Key.f12: "f12",
-        }
-        return name_map.get(key)
-    if isinstance(key, KeyCode):
-        if key.vk and 96 <= key.vk <= 105:
-            return f"num_{key.vk - 96}"
-        if key.vk == 106:
-            return "num_multiply"
-        if key.vk == 107:
-            return "num_plus"
-        if key.vk == 109:
-            return "num_minus"
-        if key.vk == 110:
-            return "num_decimal"
-        if key.vk == 111:
-            return "num_divide"
-        if key.char:
-            return key.char.lower()
-    return None
-
-
-TURBO_INTERVAL = 0.01
+    def __init__(self):
+        self.pending = 0
 
 
 class HookEngine:
     WM_KEYDOWN = 0x0100
     WM_SYSKEYDOWN = 0x0104
+    WM_MOUSEMOVE = 0x0200
+    WIN32_MOUSE_BUTTONS = {
+        0x0201: ("mouse_left", True),
+        0x0202: ("mouse_left", False),
+        0x0204: ("mouse_right", True),
+        0x0205: ("mouse_right", False),
+        0x0207: ("mouse_middle", True),
+        0x0208: ("mouse_middle", False),
+    }
 
-    def __init__(self):
-        self._mappings: list[MappingItem] = []
-        self._keyboard_listener: keyboard.Listener | None = None
-        self._mouse_listener: mouse.Listener | None = None
+    def __init__(
+        self,
+        backend: InjectionBackend | None = None,
+        max_workers: int = 4,
+        precise_timing: bool = False,
+        native_hook: bool = False,
+    ):
+        self._pid = os.getpid()
+        self._backend = backend if backend is not None else default_backend()
+        self._tables = DispatchTables()
+        self._profiles: dict[str, DispatchTables] = {}
+        self._profile_names: tuple[str, ...] = ()
+        self._active_profile = ""
+        self._profile_switch: frozenset[tuple[int, int]] = frozenset()
+        self.on_profile_changed: Callable[[str, bool], None] | None = None
+        self.recording_loader: Callable[[str], Recording | None] | None = None
+        self._recording: Recording | None = None
+        self._mouse_moves = False
+        self._install_hooks = True
+        self._native_hook = native_hook and IS_WINDOWS
+        self._hooked_vks = bytearray(256)
+        self._keyboard_listener: "keyboard.Listener | LowLevelKeyboardHook | None" = None
+        self._mouse_listener: "mouse.Listener | None" = None
+        self._button_values: dict = {}
+        self._normalize_key: Callable | None = None
+        self._quartz = None
+        self._darwin_buttons: dict[int, tuple[str, bool]] = {}
+        self._darwin_moves: frozenset[int] = frozenset()
         self._running = False
-        self._vk_to_mapping: dict[int, MappingItem] = {}
-        self._loop_events: dict[str, threading.Event] = {}
-        self._stop_vk_to_mapping_id: dict[int, str] = {}
-        self._stop_mouse_to_mapping_id: dict[str, str] = {}
+        self._modifier_state = 0
+        self._suppressed = bytearray(256)
+        self._suppressed_buttons = bytearray(8)
+        self._keys_down = bytearray(256)
+        self._direct_down: list[DirectRemap | None] = [None] * 256
+        self._runs: dict[str, TriggerRun] = {}
+        self._runs_lock = threading.Lock()
+        self._precise_timing = precise_timing
+        self._scheduler = MacroScheduler(
+            max_workers=max_workers,
+            spin_threshold=PRECISE_SPIN_THRESHOLD if precise_timing else 0.0,
+        )
+        self._loop_stats: dict[str, LoopTimingStats] = {}
+        self._handoff = HandoffQueue()
+        self._dispatch_thread: threading.Thread | None = None
+        self._keyboard_timing = LatencyRecorder()
+        self.metrics = EngineMetrics()
+        self.metrics.live_loops = lambda: self._scheduler.loop_count
+        self.metrics.macro_errors = lambda: self._scheduler.errors
+        self._mouse_timing = LatencyRecorder()
 
     @property
     def is_running(self) -> bool:
         return self._running
 
-    VK_VARIANTS = {
-        0x10: [0xA0, 0xA1],
-        0x11: [0xA2, 0xA3],
-        0x12: [0xA4, 0xA5],
-    }
+    @property
+    def active_profile(self) -> str:
+        return self._active_profile
+
+    @property
+    def recording(self) -> Recording | None:
+        return self._recording
 
-    def _register_vk(self, vk: int, value):
-        self._vk_to_mapping[vk] = value
-        for variant in self.VK_VARIANTS.get(vk, []):
-            self._vk_to_mapping[variant] = value
+    def compiled_plan(self, mapping_id: str) -> Plan | None:
+        return self._tables.plans.get(mapping_id)
 
-    def _register_stop_vk(self, vk: int, mapping_id: str):
-        self._stop_vk_to_mapping_id[vk] = mapping_id
-        for variant in self.VK_VARIANTS.get(vk, []):
-            self._stop_vk_to_mapping_id[variant] = mapping_id
+    def loop_timing(self, mapping_id: str) -> LoopTimingStats | None:
+        return self._loop_stats.get(mapping_id)
 
-    def start(self, mappings: list[MappingItem]):
+    @property
+    def pending_jobs(self) -> int:
+        return self._scheduler.pending_count
+
+    @property
+    def active_jobs(self) -> int:
+        return self._scheduler.active_count
+
+    def start(self, mappings: list[MappingItem], install_hooks: bool = True):
+        self.start_profiles({"": mappings}, "", install_hooks)
+
+    def start_profiles(
+        self,
+        profiles: dict[str, list[MappingItem]],
+        active: str,
+        install_hooks: bool = True,
+    ):
         if self._running:
             self.stop()
 
-        self._mappings = [m for m in mappings if m.enabled]
-        self._loop_events = {}
-        self._stop_vk_to_mapping_id = {}
-        self._stop_mouse_to_mapping_id = {}
+        self._backend.open()
+        self._profiles = {}
+        self._install_hooks = install_hooks
+        self._modifier_state = 0
+        self._suppressed = bytearray(256)
+        self._suppressed_buttons = bytearray(8)
+        self._keys_down = bytearray(256)
+        self._direct_down = [None] * 256
+        self._runs = {}
+        self._publish_profiles(profiles, active)
+
+        self._handoff = HandoffQueue()
+        self._dispatch_thread = threading.Thread(
+            target=self._dispatch_loop, args=(self._handoff,), name="hook-dispatch", daemon=True
+        )
+        self._dispatch_thread.start()
+        self._sync_listeners()
+
+        if self._precise_timing and IS_WINDOWS:
+            ctypes.windll.winmm.timeBeginPeriod(1)
+        self._scheduler.start()
+        self._running = True
 
-        mouse_sources = {
-            m.source.value for m in self._mappings if m.source.event_type == "mouse"
-        }
+    def update_profiles(self, profiles: dict[str, list[MappingItem]], active: str):
+        if not self._running:
+            return
+        previous = self._tables
+        self._publish_profiles(profiles, active)
+        self._cancel_changed(previous)
+        self._sync_listeners()
 
-        self._vk_to_mapping = {}
-        for m in self._mappings:
-            if m.source.event_type == "keyboard":
-                vk = VK_MAP.get(m.source.value)
-                if vk:
-                    self._register_vk(vk, m)
-
-            if m.stop_key:
-                if m.stop_key.event_type == "keyboard":
-                    stop_vk = VK_MAP.get(m.stop_key.value)
-                    if stop_vk:
-                        self._register_stop_vk(stop_vk, m.id)
-                elif m.stop_key.event_type == "mouse":
-                    self._stop_mouse_to_mapping_id[m.stop_key.value] = m.id
-
-        need_keyboard = bool(self._vk_to_mapping) or bool(self._stop_vk_to_mapping_id)
-        need_mouse = bool(mouse_sources) or bool(self._stop_mouse_to_mapping_id)
-
-        if need_keyboard:
-            self._keyboard_listener = keyboard.Listener(
-                on_press=lambda key: None,
-                on_release=lambda key: None,
-                win32_event_filter=self._win32_filter,
-            )
-            self._keyboard_listener.start()
+    def update_mappings(self, mappings: list[MappingItem], profile: str | None = None):
+        if not self._running:
+            return
+        name = self._active_profile if profile is None else profile
+        tables = compile_tables(
+            mappings,
+            self._backend,
+            self.metrics,
+            self._profiles.get(name),
+            self.recording_loader,
+        )
+        self._profiles = {**self._profiles, name: tables}
+        self._profile_names = tuple(self._profiles)
+        self._retain_metrics()
+        if name == self._active_profile:
+            previous = self._tables
+            self._tables = tables
+            self._cancel_changed(previous)
+        self._sync_listeners()
+
+    def switch_profile(self, name: str, notify: bool = False, manual: bool = False) -> bool:
+        tables = self._profiles.get(name)
+        if tables is None:
+            return False
+        previous = self._tables
+        self._tables = tables
+        self._active_profile = name
+        if self._running and notify:
+            action = HANDOFF_PROFILE_KEY if manual else HANDOFF_PROFILE
+            self._handoff.put((action, name, previous, time.perf_counter_ns()))
+        elif self._running:
+            self._cancel_changed(previous)
+        return True
+
+    def set_profile_switch_key(self, value: str | None, modifiers: list[str] | None = None):
+        chords = keyboard_chords(value, modifiers or []) if value else []
+        self._profile_switch = frozenset(chords)
+        if self._running:
+            self._sync_listeners()
 
-        if need_mouse:
-            self._mouse_listener = mouse.Listener(
-                on_click=self._on_mouse_click,
+    def _publish_profiles(self, profiles: dict[str, list[MappingItem]], active: str):
+        previous = self._profiles
+        compiled = {
+            name: compile_tables(
+                mappings, self._backend, self.metrics, previous.get(name), self.recording_loader
             )
-            self._mouse_listener.start()
-
-        self._running = True
-
-    def stop(self):
-        for event in self._loop_events.values():
-            event.set()
-        self._loop_events.clear()
+            for name, mappings in profiles.items()
+        }
+        if active not in compiled:
+            active = next(iter(compiled), "")
+            compiled.setdefault(active, DispatchTables())
+        self._profiles = compiled
+        self._profile_names = tuple(compiled)
+        self._retain_metrics()
+        self._tables = compiled[active]
+        self._active_profile = active
+
+    def _retain_metrics(self):
+        live = set()
+        for tables in self._profiles.values():
+            live.update(tables.mapping_by_id)
+        self.metrics.retain(live)
+
+    def start_recording(self) -> Recording:
+        recording = Recording()
+        self._recording = recording
+        self._sync_listeners()
+        return recording
+
+    def stop_recording(self) -> Recording | None:
+        recording, self._recording = self._recording, None
+        self._sync_listeners()
+        return recording
+
+    def _cancel_changed(self, previous: DispatchTables):
+        for mapping_id in previous.changed_ids(self._tables):
+            self._scheduler.cancel(mapping_id)
+
+    def _cycle_profile(self):
+        names = self._profile_names
+        if len(names) < 2 or self._active_profile not in names:
+            return
+        name = names[(names.index(self._active_profile) + 1) % len(names)]
+        self.switch_profile(name, notify=True, manual=True)
 
-        if self._keyboard_listener:
+    def _load_pynput(self):
+        if self._normalize_key is not None:
+            return
+        from app.engine.pynput_keys import BUTTON_VALUES, normalize_key
+
+        if IS_MACOS:
+            import Quartz
+
+            self._quartz = Quartz
+            self._darwin_buttons = {
+                Quartz.kCGEventLeftMouseDown: ("mouse_left", True),
+                Quartz.kCGEventLeftMouseUp: ("mouse_left", False),
+                Quartz.kCGEventRightMouseDown: ("mouse_right", True),
+                Quartz.kCGEventRightMouseUp: ("mouse_right", False),
+                Quartz.kCGEventOtherMouseDown: ("mouse_middle", True),
+                Quartz.kCGEventOtherMouseUp: ("mouse_middle", False),
+            }
+            self._darwin_moves = frozenset(
+                (
+                    Quartz.kCGEventMouseMoved,
+                    Quartz.kCGEventLeftMouseDragged,
+                    Quartz.kCGEventRightMouseDragged,
+                    Quartz.kCGEventOtherMouseDragged,
+                )
+            )
+        self._button_values = BUTTON_VALUES
+        self._normalize_key = normalize_key
+
+    def _sync_listeners(self):
+        recording = self._recording is not None
+        profiles = self._profiles.values()
+        need_keyboard = recording or (bool(self._profile_switch) and len(self._profiles) > 1)
+        need_keyboard = need_keyboard or any(t.need_keyboard for t in profiles)
+        need_mouse = recording or any(t.need_mouse for t in profiles)
+
+        if (need_keyboard or need_mouse) and self._install_hooks:
+            self._load_pynput()
+
+        hooked = {*VK_MODIFIER_SIDES, *(vk for vk, _ in self._profile_switch)}
+        for tables in profiles:
+            hooked |= tables.hooked_vks
+        held = zip(self._keys_down, self._suppressed, self._direct_down)
+        hooked.update(vk for vk, state in enumerate(held) if any(state))
+        hooked_vks = bytearray(256)
+        for vk in hooked:
+            hooked_vks[vk] = 1
+        self._hooked_vks = hooked_vks
+
+        if need_keyboard and self._install_hooks:
+            if self._keyboard_listener is None:
+                self._keyboard_listener = self._create_keyboard_listener()
+                self._keyboard_listener.start()
+        elif self._keyboard_listener:
             self._keyboard_listener.stop()
             self._keyboard_listener = None
-        if self._mouse_listener:
+
+        if need_mouse and self._install_hooks:
+            moves = recording or IS_WINDOWS or IS_MACOS
+            if self._mouse_listener is not None and self._mouse_moves != moves:
+                self._mouse_listener.stop()
+                self._mouse_listener = None
+            if self._mouse_listener is None:
+                self._mouse_moves = moves
+                self._mouse_listener = self._create_mouse_listener(recording)
+                self._mouse_listener.start()
+        elif self._mouse_listener:
             self._mouse_listener.stop()
             self._mouse_listener = None
-        self._running = False
+
+    def stop(self):
+        self._release_direct()
+        running, self._running = self._running, False
+        self._profiles = {}
+        self._profile_names = ()
+        self._sync_listeners()
+
+        if self._dispatch_thread:
+            self._handoff.put(None)
+            self._dispatch_thread.join(timeout=1.0)
+            self._dispatch_thread = None
+
+        self._scheduler.shutdown()
+        if self._precise_timing and IS_WINDOWS and running:
+            ctypes.windll.winmm.timeEndPeriod(1)
+
+    def _create_keyboard_listener(self) -> "keyboard.Listener | LowLevelKeyboardHook":
+        if self._native_hook:
+            from app.engine.win32_hook import LowLevelKeyboardHook
+
+            return LowLevelKeyboardHook(self._native_key)
+
+        from pynput import keyboard
+
+        if IS_WINDOWS:
+            return keyboard.Listener(
+                on_press=lambda key, injected=False: None,
+                on_release=lambda key, injected=False: None,
+                win32_event_filter=self._win32_filter,
+            )
+        if IS_MACOS:
+            return keyboard.Listener(darwin_intercept=self._darwin_intercept)
+        return keyboard.Listener(
+            on_press=lambda key, injected=False: self._on_pynput_key(key, True, injected),
+            on_release=lambda key, injected=False: self._on_pynput_key(key, False, injected),
+        )
+
+    def _create_mouse_listener(self, moves: bool) -> "mouse.Listener":
+        from pynput import mouse
+
+        if IS_WINDOWS:
+            return mouse.Listener(win32_event_filter=self._win32_mouse_filter)
+        if IS_MACOS:
+            return mouse.Listener(darwin_intercept=self._darwin_mouse_intercept)
+        return mouse.Listener(
+            on_click=self._on_mouse_click,
+            on_move=self._on_mouse_move if moves else None,
+        )
+
+    def _handle_key(self, vk: int, pressed: bool, timestamp: int) -> bool:
+        recording = self._recording
+        if recording is not None:
+            recording.add_key(timestamp, vk, pressed)
+            if not self._running:
+                return False
+
+        tables = self._tables
+        suppress = False
+        repeat = pressed and self._keys_down[vk]
+        self._keys_down[vk] = pressed
+
+        stop_id = tables.stop_vk.get(vk)
+        if stop_id is not None:
+            if pressed and not repeat:
+                self._handoff.put((HANDOFF_STOP, stop_id, None, timestamp))
+            suppress = True
+
+        if pressed:
+            mask = SIDE_STATE_TO_MASK[self._modifier_state]
+            direct = self._direct_down[vk] if repeat else tables.direct_dispatch.get((vk, mask))
+            mapping = tables.key_dispatch.get((vk, mask))
+            if direct is not None:
+                self._direct_down[vk] = direct
+                self._send_direct(direct, direct.down, timestamp, not repeat)
+                suppress = True
+            elif (vk, mask) in self._profile_switch:
+                self._suppressed[vk] = 1
+                if not repeat:
+                    self._cycle_profile()
+                suppress = True
+            elif mapping is not None:
+                self._suppressed[vk] = 1
+                if repeat and mapping.trigger_policy != TRIGGER_REPEAT:
+                    self.metrics.repeats += 1
+                else:
+                    self._handoff.put((HANDOFF_TRIGGER, mapping, None, timestamp))
+                suppress = True
+        elif self._direct_down[vk] is not None:
+            direct, self._direct_down[vk] = self._direct_down[vk], None
+            self._send_direct(direct, direct.up, timestamp, False)
+            suppress = True
+        elif self._suppressed[vk]:
+            self._suppressed[vk] = 0
+            suppress = True
+
+        side = VK_MODIFIER_SIDES.get(vk)
+        if side:
+            if pressed:
+                self._modifier_state |= side
+            else:
+                self._modifier_state &= ~side
+
+        if suppress:
+            self.metrics.suppressed += 1
+        return suppress
+
+    def _send_direct(self, direct: DirectRemap, batch, timestamp: int, trigger: bool):
+        self._backend.send_batch(batch)
+        metrics = direct.metrics
+        metrics.injected += direct.edges
+        self.metrics.injected += direct.edges
+        if trigger:
+            metrics.triggers += 1
+            metrics.latency.observe((time.perf_counter_ns() - timestamp) / 1e6)
+
+    def _release_direct(self):
+        for vk, direct in enumerate(self._direct_down):
+            if direct is not None:
+                self._direct_down[vk] = None
+                self._backend.send_batch(direct.up)
 
     def _win32_filter(self, msg, data):
-        if IS_WINDOWS and data.dwExtraInfo == INJECTED_MARKER:
-            return
+        start = time.perf_counter_ns()
+        try:
+            if data.dwExtraInfo == INJECTED_MARKER:
+                return
+            if self._handle_key(data.vkCode, msg in (self.WM_KEYDOWN, self.WM_SYSKEYDOWN), start):
+                self._keyboard_listener.suppress_event()
+        finally:
+            self._keyboard_timing.record(time.perf_counter_ns() - start)
+
+    def _native_key(self, vk: int, pressed: bool) -> bool:
+        if not self._hooked_vks[vk] and self._recording is None:
+            return False
+        start = time.perf_counter_ns()
+        try:
+            return self._handle_key(vk, pressed, start)
+        finally:
+            self._keyboard_timing.record(time.perf_counter_ns() - start)
+
+    def _darwin_intercept(self, event_type, event):
+        start = time.perf_counter_ns()
+        Quartz = self._quartz
+        try:
+            source_pid = Quartz.CGEventGetIntegerValueField(
+                event, Quartz.kCGEventSourceUnixProcessID
+            )
+            if source_pid == self._pid:
+                return event
 
-        vk = data.vkCode
+            keycode = Quartz.CGEventGetIntegerValueField(event, Quartz.kCGKeyboardEventKeycode)
+            vk = MAC_KEYCODE_TO_VK.get(keycode)
+            if vk is None:
+                return event
 
-        if vk in self._stop_vk_to_mapping_id:
-            if msg in (self.WM_KEYDOWN, self.WM_SYSKEYDOWN):
-                mapping_id = self._stop_vk_to_mapping_id[vk]
-                if mapping_id in self._loop_events:
-                    self._loop_events[mapping_id].set()
-            self._keyboard_listener.suppress_event()
+            if event_type == Quartz.kCGEventFlagsChanged:
+                pressed = bool(Quartz.CGEventGetFlags(event) & MAC_MODIFIER_FLAGS.get(keycode, 0))
+            else:
+                pressed = event_type == Quartz.kCGEventKeyDown
 
-        if vk in self._vk_to_mapping:
-            if msg in (self.WM_KEYDOWN, self.WM_SYSKEYDOWN):
-                mapping = self._vk_to_mapping[vk]
-                self._trigger_mapping(mapping)
-            self._keyboard_listener.suppress_event()
+            if self._handle_key(vk, pressed, start):
+                return None
+            return event
+        finally:
+            self._keyboard_timing.record(time.perf_counter_ns() - start)
 
-    def _on_mouse_click(self, x, y, button, pressed, injected=False):
+    def _on_pynput_key(self, key, pressed: bool, injected: bool):
+        start = time.perf_counter_ns()
         if injected:
             return
+        value = self._normalize_key(key)
+        vk = VK_MAP.get(value) if value else None
+        if vk:
+            self._handle_key(vk, pressed, start)
+        self._keyboard_timing.record(time.perf_counter_ns() - start)
+
+    def _handle_button(self, value: str, pressed: bool, x: int, y: int, timestamp: int) -> bool:
+        code = MOUSE_BUTTONS[value]
+        recording = self._recording
+        if recording is not None:
+            recording.add_button(timestamp, code, pressed, x, y)
+        if not self._running:
+            return False
+
+        if not pressed:
+            if not self._suppressed_buttons[code]:
+                return False
+            self._suppressed_buttons[code] = 0
+        else:
+            tables = self._tables
+            mapping = tables.mouse_dispatch.get((value, SIDE_STATE_TO_MASK[self._modifier_state]))
+            stop_id = tables.stop_mouse.get(value)
+            if stop_id is not None:
+                self._handoff.put((HANDOFF_MOUSE_STOP, stop_id, mapping, timestamp))
+            elif mapping is not None:
+                self._handoff.put((HANDOFF_TRIGGER, mapping, None, timestamp))
+            if mapping is None:
+                return False
+            self._suppressed_buttons[code] = 1
+
+        self.metrics.suppressed += 1
+        return True
+
+    def _win32_mouse_filter(self, msg, data):
+        if msg == self.WM_MOUSEMOVE:
+            recording = self._recording
+            if recording is not None and data.dwExtraInfo != INJECTED_MARKER:
+                recording.add_move(time.perf_counter_ns(), data.pt.x, data.pt.y)
+            return False
+        button = self.WIN32_MOUSE_BUTTONS.get(msg)
+        if button is None or data.dwExtraInfo == INJECTED_MARKER:
+            return False
+        start = time.perf_counter_ns()
+        try:
+            if self._handle_button(*button, data.pt.x, data.pt.y, start):
+                self._mouse_listener.suppress_event()
+        finally:
+            self._mouse_timing.record(time.perf_counter_ns() - start)
+        return False
+
+    def _darwin_mouse_intercept(self, event_type, event):
+        Quartz = self._quartz
+        moved = event_type in self._darwin_moves
+        button = self._darwin_buttons.get(event_type)
+        if not moved and button is None:
+            return event
+        source_pid = Quartz.CGEventGetIntegerValueField(event, Quartz.kCGEventSourceUnixProcessID)
+        if source_pid == self._pid:
+            return event
+
+        if moved:
+            recording = self._recording
+            if recording is not None:
+                point = Quartz.CGEventGetLocation(event)
+                recording.add_move(time.perf_counter_ns(), point.x, point.y)
+            return event
+
+        start = time.perf_counter_ns()
+        try:
+            value, pressed = button
+            if value == "mouse_middle":
+                number = Quartz.CGEventGetIntegerValueField(
+                    event, Quartz.kCGMouseEventButtonNumber
+                )
+                if number != 2:
+                    return event
+            point = Quartz.CGEventGetLocation(event)
+            if self._handle_button(value, pressed, point.x, point.y, start):
+                return None
+            return event
+        finally:
+            self._mouse_timing.record(time.perf_counter_ns() - start)
 
-        button_map = {
-            Button.left: "mouse_left",
-            Button.right: "mouse_right",
-            Button.middle: "mouse_middle",
-        }
-        value = button_map.get(button)
-        if not value or not pressed:
+    def _on_mouse_click(self, x, y, button, pressed, injected=False):
+        start = time.perf_counter_ns()
+        if injected:
             return
-
-        if value in self._stop_mouse_to_mapping_id:
-            mapping_id = self._stop_mouse_to_mapping_id[value]
-            if mapping_id in self._loop_events:
-                self._loop_events[mapping_id].set()
+        value = self._button_values.get(button)
+        if value:
+            self._handle_button(value, pressed, x, y, start)
+        self._mouse_timing.record(time.perf_counter_ns() - start)
+
+    def _on_mouse_move(self, x, y, injected=False):
+        recording = self._recording
+        if recording is not None and not injected:
+            recording.add_move(time.perf_counter_ns(), x, y)
+
+    def _dispatch_loop(self, handoff: HandoffQueue):
+        while True:
+            item = handoff.get()
+            if item is None:
                 return
+            action, target, fallback, timestamp = item
+            if action == HANDOFF_TRIGGER:
+                self._trigger_mapping(target.id, timestamp)
+            elif action == HANDOFF_STOP:
+                self._scheduler.cancel(target)
+            elif action == HANDOFF_PROFILE or action == HANDOFF_PROFILE_KEY:
+                self._cancel_changed(fallback)
+                if self.on_profile_changed is not None:
+                    self.on_profile_changed(target, action == HANDOFF_PROFILE_KEY)
+            elif self._scheduler.has_job(target):
+                self._scheduler.cancel(target)
+            elif fallback is not None:
+                self._trigger_mapping(fallback.id, timestamp)
+
+    def callback_timing(self) -> dict:
+        return {
+            "keyboard": self._keyboard_timing.to_dict(),
+            "mouse": self._mouse_timing.to_dict(),
+            "handoff_dropped": self._handoff.dropped,
+        }
 
-        mapping = self._find_mouse_mapping(value)
-        if mapping:
-            self._trigger_mapping(mapping)
+    def trigger(self, mapping_id: str) -> bool:
+        if mapping_id not in self._tables.mapping_by_id or not self._running:
+            return False
+        self._trigger_mapping(mapping_id, time.perf_counter_ns())
+        return True
 
-    def _trigger_mapping(self, mapping: MappingItem):
+    def _trigger_mapping(self, mapping_id: str, triggered_ns: int = 0):
+        tables = self._tables
+        mapping = tables.mapping_by_id.get(mapping_id)
+        if mapping is None:
+            return
+        metrics = tables.metrics[mapping_id]
         if mapping.loop:
-            if mapping.id in self._loop_events:
+            if self._scheduler.has_job(mapping_id):
                 return
-            stop_event = threading.Event()
-            self._loop_events[mapping.id] = stop_event
-            threading.Thread(
-                target=self._execute_loop, args=(mapping, stop_event), daemon=True
-            ).start()
-        else:
-            threading.Thread(
-                target=self._execute_target, args=(mapping,), daemon=True
-            ).start()
-
-    def _execute_loop(self, mapping: MappingItem, stop_event: threading.Event):
-        delay = TURBO_INTERVAL if mapping.turbo else max(mapping.delay_ms / 1000, TURBO_INTERVAL)
-        while not stop_event.is_set():
-            self._execute_target(mapping)
-            if stop_event.wait(delay):
-                break
-        self._loop_events.pop(mapping.id, None)
-
-    def _find_keyboard_mapping(self, value: str) -> MappingItem | None:
-        for m in self._mappings:
-            if m.source.event_type == "keyboard" and m.source.value == value:
-                return m
-        return None
-
-    def _find_mouse_mapping(self, value: str) -> MappingItem | None:
-        for m in self._mappings:
-            if m.source.event_type == "mouse" and m.source.value == value:
-                return m
-        return None
-
-    def _execute_target(self, mapping: MappingItem):
-        MODIFIER_KEYS = {"shift", "ctrl", "alt", "meta"}
-
-        if mapping.turbo:
-            action_delay = TURBO_INTERVAL
-        elif mapping.delay_ms > 0:
-            action_delay = mapping.delay_ms / 1000
-        else:
-            action_delay = 0.05
+            metrics.triggers += 1
+            self._scheduler.submit(
+                self._execute_loop(mapping, tables, triggered_ns), key=mapping_id, loop=True
+            )
+            return
 
-        modifiers = []
-        actions = []
-        for event in mapping.target:
-            if event.event_type == "keyboard" and event.value in MODIFIER_KEYS:
-                modifiers.append(event)
-            else:
-                actions.append(event)
+        policy = mapping.trigger_policy
+        if policy == TRIGGER_ONCE or policy == TRIGGER_REPEAT:
+            metrics.triggers += 1
+            self._scheduler.submit(self._execute_target(mapping, tables, triggered_ns))
+            return
 
-        if IS_WINDOWS:
-            for mod in modifiers:
-                vk = VK_MAP.get(mod.value)
-                if vk:
-                    _send_key_event(vk)
-                    time.sleep(0.02)
-
-            for i, event in enumerate(actions):
-                if i > 0:
-                    time.sleep(action_delay)
-                if event.event_type == "keyboard":
-                    vk = VK_MAP.get(event.value)
-                    if vk:
-                        _send_key_event(vk)
-                        time.sleep(0.03)
-                        _send_key_event(vk, key_up=True)
-                elif event.event_type == "mouse":
-                    down_up = MOUSE_DOWN_UP.get(event.value)
-                    if down_up and down_up[0]:
-                        _send_mouse_event(down_up[0])
-                        time.sleep(0.03)
-                        _send_mouse_event(down_up[1])
-
-            for mod in reversed(modifiers):
-                vk = VK_MAP.get(mod.value)
-                if vk:
-                    time.sleep(0.02)
-                    _send_key_event(vk, key_up=True)
+        with self._runs_lock:
+            previous = self._runs.get(mapping_id)
+            if previous is not None and not self._scheduler.has_job(mapping_id):
+                previous = None
+            if previous is not None and policy != TRIGGER_RESTART:
+                if previous.pending < PENDING_LIMITS[policy]:
+                    previous.pending += 1
+                    metrics.triggers += 1
+                else:
+                    metrics.dropped += 1
+                return
+            run = self._runs[mapping_id] = TriggerRun()
+        metrics.triggers += 1
+        self._scheduler.replace(mapping_id, self._execute_run(mapping, tables, run, triggered_ns))
+
+    def _release_run(self, mapping_id: str, run: TriggerRun):
+        if self._runs.get(mapping_id) is run:
+            del self._runs[mapping_id]
+
+    def _execute_run(
+        self,
+        mapping: MappingItem,
+        tables: DispatchTables,
+        run: TriggerRun,
+        triggered_ns: int = 0,
+    ) -> MacroSteps:
+        try:
+            while True:
+                yield from self._execute_target(mapping, tables, triggered_ns)
+                with self._runs_lock:
+                    if not run.pending:
+                        self._release_run(mapping.id, run)
+                        return
+                    run.pending -= 1
+                triggered_ns = 0
+        finally:
+            with self._runs_lock:
+                self._release_run(mapping.id, run)
+
+    def _execute_loop(
+        self, mapping: MappingItem, tables: DispatchTables, triggered_ns: int = 0
+    ) -> MacroSteps:
+        plan = tables.plans[mapping.id]
+        if mapping.id in tables.recordings:
+            played = tables.recordings[mapping.id].duration
+        elif mapping.id in tables.batches:
+            played = 0.0
+        else:
+            played = plan_duration(plan)
+        delay = loop_delay(mapping, plan, played)
+        stats = LoopTimingStats(played + delay)
+        self._loop_stats[mapping.id] = stats
+        while True:
+            stats.record(time.perf_counter())
+            yield from self._execute_target(mapping, tables, triggered_ns)
+            triggered_ns = 0
+            yield delay
+
+    def _record_injection(self, metrics: MappingMetrics, count: int, triggered_ns: int):
+        metrics.injected += count
+        self.metrics.injected += count
+        if triggered_ns:
+            metrics.latency.observe((time.perf_counter_ns() - triggered_ns) / 1e6)
+
+    def _execute_target(
+        self, mapping: MappingItem, tables: DispatchTables, triggered_ns: int = 0
+    ) -> MacroSteps:
+        backend = self._backend
+        metrics = tables.metrics[mapping.id]
+        recording = tables.recordings.get(mapping.id)
+        if recording is not None:
+            yield from self._play_recording(recording, metrics, triggered_ns)
+            return
+        plan = tables.plans[mapping.id]
+        batch = tables.batches.get(mapping.id)
+        if batch is not None:
+            backend.send_batch(batch)
+            self._record_injection(metrics, len(plan), triggered_ns)
+            return
+
+        held: list[tuple[int, int]] = []
+        try:
+            for op, code, wait in plan:
+                backend.send(op, code)
+                self._record_injection(metrics, 1, triggered_ns)
+                triggered_ns = 0
+                if op == KEY_DOWN or op == MOUSE_DOWN:
+                    held.append((op + 1, code))
+                else:
+                    held.remove((op, code))
+                if wait:
+                    yield wait
+        finally:
+            while held:
+                backend.send(*held.pop())
+
+    def _play_recording(
+        self, recording: Recording, metrics: MappingMetrics, triggered_ns: int = 0
+    ) -> MacroSteps:
+        backend = self._backend
+        held: set[tuple[int, int]] = set()
+        elapsed = 0.0
+        try:
+            for timestamp, op, code, x, y in recording:
+                if timestamp > elapsed:
+                    yield timestamp - elapsed
+                    elapsed = timestamp
+                if op == MOUSE_MOVE:
+                    backend.move(x, y)
+                    continue
+                if op == MOUSE_DOWN or op == MOUSE_UP:
+                    backend.move(x, y)
+                backend.send(op, code)
+                self._record_injection(metrics, 1, triggered_ns)
+                triggered_ns = 0
+                if op == KEY_DOWN or op == MOUSE_DOWN:
+                    held.add((op + 1, code))
+                else:
+                    held.discard((op, code))
+        finally:
+            for op, code in held:
+                backend.send(op, code)
@@ -0,0 +1,97 @@
+VK_MAP = {
+    "a": 0x41, "b": 0x42, "c": 0x43, "d": 0x44, "e": 0x45,
+    "f": 0x46, "g": 0x47, "h": 0x48, "i": 0x49, "j": 0x4A,
+    "k": 0x4B, "l": 0x4C, "m": 0x4D, "n": 0x4E, "o": 0x4F,
+    "p": 0x50, "q": 0x51, "r": 0x52, "s": 0x53, "t": 0x54,
+    "u": 0x55, "v": 0x56, "w": 0x57, "x": 0x58, "y": 0x59, "z": 0x5A,
+    "0": 0x30, "1": 0x31, "2": 0x32, "3": 0x33, "4": 0x34,
+    "5": 0x35, "6": 0x36, "7": 0x37, "8": 0x38, "9": 0x39,
+    "f1": 0x70, "f2": 0x71, "f3": 0x72, "f4": 0x73,
+    "f5": 0x74, "f6": 0x75, "f7": 0x76, "f8": 0x77,
+    "f9": 0x78, "f10": 0x79, "f11": 0x7A, "f12": 0x7B,
+    "escape": 0x1B, "tab": 0x09, "backspace": 0x08,
+    "enter": 0x0D, "space": 0x20, "delete": 0x2E, "insert": 0x2D,
+    "home": 0x24, "end": 0x23, "page_up": 0x21, "page_down": 0x22,
+    "up": 0x26, "down": 0x28, "left": 0x25, "right": 0x27,
+    "shift": 0x10, "ctrl": 0x11, "alt": 0x12, "meta": 0x5B,
+    "caps_lock": 0x14, "num_lock": 0x90, "scroll_lock": 0x91,
+    "print_screen": 0x2C, "pause": 0x13,
+    "minus": 0xBD, "equal": 0xBB,
+    "bracket_left": 0xDB, "bracket_right": 0xDD,
+    "backslash": 0xDC, "semicolon": 0xBA, "apostrophe": 0xDE,
+    "comma": 0xBC, "period": 0xBE, "slash": 0xBF, "grave": 0xC0,
+    "num_0": 0x60, "num_1": 0x61, "num_2": 0x62, "num_3": 0x63,
+    "num_4": 0x64, "num_5": 0x65, "num_6": 0x66, "num_7": 0x67,
+    "num_8": 0x68, "num_9": 0x69,
+    "num_multiply": 0x6A, "num_plus": 0x6B, "num_minus": 0x6D,
+    "num_decimal": 0x6E, "num_divide": 0x6F, "num_enter": 0x0D,
+}
+
+MODIFIER_KEYS = frozenset({"shift", "ctrl", "alt", "meta"})
+
+MODIFIER_BITS = {"shift": 0x1, "ctrl": 0x2, "alt": 0x4, "meta": 0x8}
+ALL_MODIFIER_MASKS = tuple(range(16))
+
+VK_MODIFIER_SIDES = {
+    0x10: 0x01, 0xA0: 0x01, 0xA1: 0x02,
+    0x11: 0x04, 0xA2: 0x04, 0xA3: 0x08,
+    0x12: 0x10, 0xA4: 0x10, 0xA5: 0x20,
+    0x5B: 0x40, 0x5C: 0x80,
+}
+
+SIDE_STATE_TO_MASK = tuple(
+    (0x1 if state & 0x03 else 0)
+    | (0x2 if state & 0x0C else 0)
+    | (0x4 if state & 0x30 else 0)
+    | (0x8 if state & 0xC0 else 0)
+    for state in range(256)
+)
+
+
+def modifier_mask(names) -> int:
+    mask = 0
+    for name in names:
+        mask |= MODIFIER_BITS.get(name, 0)
+    return mask
+
+
+MOUSE_BUTTONS = {
+    "mouse_left": 1,
+    "mouse_right": 2,
+    "mouse_middle": 3,
+}
+
+MAC_KEYCODES = {
+    "a": 0x00, "s": 0x01, "d": 0x02, "f": 0x03, "h": 0x04, "g": 0x05,
+    "z": 0x06, "x": 0x07, "c": 0x08, "v": 0x09, "b": 0x0B, "q": 0x0C,
+    "w": 0x0D, "e": 0x0E, "r": 0x0F, "y": 0x10, "t": 0x11,
+    "1": 0x12, "2": 0x13, "3": 0x14, "4": 0x15, "6": 0x16, "5": 0x17,
+    "equal": 0x18, "9": 0x19, "7": 0x1A, "minus": 0x1B, "8": 0x1C, "0": 0x1D,
+    "bracket_right": 0x1E, "o": 0x1F, "u": 0x20, "bracket_left": 0x21,
+    "i": 0x22, "p": 0x23, "enter": 0x24, "l": 0x25, "j": 0x26,
+    "apostrophe": 0x27, "k": 0x28, "semicolon": 0x29, "backslash": 0x2A,
+    "comma": 0x2B, "slash": 0x2C, "n": 0x2D, "m": 0x2E, "period": 0x2F,
+    "tab": 0x30, "space": 0x31, "grave": 0x32, "backspace": 0x33,
+    "escape": 0x35, "meta": 0x37, "shift": 0x38, "caps_lock": 0x39,
+    "alt": 0x3A, "ctrl": 0x3B,
+    "num_decimal": 0x41, "num_multiply": 0x43, "num_plus": 0x45,
+    "num_divide": 0x4B, "num_enter": 0x4C, "num_minus": 0x4E,
+    "num_0": 0x52, "num_1": 0x53, "num_2": 0x54, "num_3": 0x55,
+    "num_4": 0x56, "num_5": 0x57, "num_6": 0x58, "num_7": 0x59,
+    "num_8": 0x5B, "num_9": 0x5C,
+    "f5": 0x60, "f6": 0x61, "f7": 0x62, "f3": 0x63, "f8": 0x64,
+    "f9": 0x65, "f11": 0x67, "f10": 0x6D, "f12": 0x6F,
+    "insert": 0x72, "home": 0x73, "page_up": 0x74, "delete": 0x75,
+    "f4": 0x76, "end": 0x77, "f2": 0x78, "page_down": 0x79, "f1": 0x7A,
+    "left": 0x7B, "right": 0x7C, "down": 0x7D, "up": 0x7E,
+}
+
+MAC_KEYCODE_TO_VK = {code: VK_MAP[value] for value, code in MAC_KEYCODES.items()}
+MAC_KEYCODE_TO_VK.update({0x36: 0x5C, 0x3C: 0xA1, 0x3D: 0xA5, 0x3E: 0xA3})
+
+MAC_MODIFIER_FLAGS = {
+    0x38: 0x20000, 0x3C: 0x20000,
+    0x3B: 0x40000, 0x3E: 0x40000,
+    0x3A: 0x80000, 0x3D: 0x80000,
+    0x37: 0x100000, 0x36: 0x100000,
+}
@@ -0,0 +1,240 @@
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0)
+
+DEFAULT_EXPORT_PORT = 9464
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "count", "total")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = array("Q", bytes(8 * (len(bounds) + 1)))
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = self.count * fraction
+        seen = 0
+        for bound, bucket in zip(self.bounds, self.counts):
+            seen += bucket
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class MappingMetrics:
+    __slots__ = ("label", "triggers", "dropped", "injected", "latency")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.triggers = 0
+        self.dropped = 0
+        self.injected = 0
+        self.latency = Histogram()
+
+
+class EngineMetrics:
+    def __init__(self):
+        self.mappings: dict[str, MappingMetrics] = {}
+        self.suppressed = 0
+        self.repeats = 0
+        self.injected = 0
+        self.live_loops: Callable[[], int] = lambda: 0
+        self.macro_errors: Callable[[], int] = lambda: 0
+
+    def register(self, mapping_id: str, label: str) -> MappingMetrics:
+        metrics = self.mappings.get(mapping_id)
+        if metrics is None:
+            metrics = self.mappings[mapping_id] = MappingMetrics(label)
+        else:
+            metrics.label = label
+        return metrics
+
+    def retain(self, mapping_ids: set[str]):
+        self.mappings = {
+            mapping_id: metrics
+            for mapping_id, metrics in self.mappings.items()
+            if mapping_id in mapping_ids
+        }
+
+    @property
+    def triggers(self) -> int:
+        return sum(m.triggers for m in self.mappings.values())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _mapping_series(engines: dict[str, EngineMetrics]):
+    for name, metrics in engines.items():
+        for mapping_id, m in list(metrics.mappings.items()):
+            yield f'engine="{name}",mapping="{mapping_id}",source="{_escape(m.label)}"', m
+
+
+def render_prometheus(engines: dict[str, EngineMetrics]) -> str:
+    lines = [
+        "# HELP keymapper_events_suppressed_total Source events swallowed by the hook.",
+        "# TYPE keymapper_events_suppressed_total counter",
+    ]
+    for name, metrics in engines.items():
+        lines.append(f'keymapper_events_suppressed_total{{engine="{name}"}} {metrics.suppressed}')
+
+    lines += [
+        "# HELP keymapper_autorepeats_ignored_total Key autorepeats that did not trigger.",
+        "# TYPE keymapper_autorepeats_ignored_total counter",
+    ]
+    for name, metrics in engines.items():
+        lines.append(f'keymapper_autorepeats_ignored_total{{engine="{name}"}} {metrics.repeats}')
+
+    lines += [
+        "# HELP keymapper_events_injected_total Input edges sent by the injection backend.",
+        "# TYPE keymapper_events_injected_total counter",
+    ]
+    for name, metrics in engines.items():
+        lines.append(f'keymapper_events_injected_total{{engine="{name}"}} {metrics.injected}')
+
+    lines += [
+        "# HELP keymapper_loops_live Loop mappings currently running.",
+        "# TYPE keymapper_loops_live gauge",
+    ]
+    for name, metrics in engines.items():
+        lines.append(f'keymapper_loops_live{{engine="{name}"}} {metrics.live_loops()}')
+
+    lines += [
+        "# HELP keymapper_macro_errors_total Macro jobs that stopped on an exception.",
+        "# TYPE keymapper_macro_errors_total counter",
+    ]
+    for name, metrics in engines.items():
+        lines.append(f'keymapper_macro_errors_total{{engine="{name}"}} {metrics.macro_errors()}')
+
+    lines += [
+        "# HELP keymapper_mapping_triggers_total Times each mapping fired.",
+        "# TYPE keymapper_mapping_triggers_total counter",
+    ]
+    for labels, m in _mapping_series(engines):
+        lines.append(f"keymapper_mapping_triggers_total{{{labels}}} {m.triggers}")
+
+    lines += [
+        "# HELP keymapper_mapping_dropped_total Triggers discarded by the mapping's policy.",
+        "# TYPE keymapper_mapping_dropped_total counter",
+    ]
+    for labels, m in _mapping_series(engines):
+        lines.append(f"keymapper_mapping_dropped_total{{{labels}}} {m.dropped}")
+
+    lines += [
+        "# HELP keymapper_mapping_injected_total Input edges sent for each mapping.",
+        "# TYPE keymapper_mapping_injected_total counter",
+    ]
+    for labels, m in _mapping_series(engines):
+        lines.append(f"keymapper_mapping_injected_total{{{labels}}} {m.injected}")
+
+    lines += [
+        "# HELP keymapper_trigger_latency_ms Time from source event to first injected edge.",
+        "# TYPE keymapper_trigger_latency_ms histogram",
+    ]
+    bucket = "keymapper_trigger_latency_ms_bucket"
+    for labels, m in _mapping_series(engines):
+        cumulative = 0
+        for bound, count in zip(m.latency.bounds, m.latency.counts):
+            cumulative += count
+            lines.append(f'{bucket}{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{bucket}{{{labels},le="+Inf"}} {m.latency.count}')
+        lines.append(f"keymapper_trigger_latency_ms_sum{{{labels}}} {m.latency.total}")
+        lines.append(f"keymapper_trigger_latency_ms_count{{{labels}}} {m.latency.count}")
+
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHttpExporter:
+    def __init__(self, render: Callable[[], str], port: int = DEFAULT_EXPORT_PORT):
+        self._render = render
+        self._port = port
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._server is not None
+
+    def start(self):
+        if self._server:
+            return
+        render = self._render
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self._port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever, name="metrics-http", daemon=True
+        ).start()
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class MetricsFileDumper:
+    def __init__(self, render: Callable[[], str], path: Path, interval: float = 10.0):
+        self._render = render
+        self._path = Path(path)
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-dump", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread:
+            self._stop.set()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+            self.dump()
+
+    def dump(self):
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        tmp_path.write_text(self._render(), encoding="utf-8")
+        os.replace(tmp_path, self._path)
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.dump()
@@ -0,0 +1,116 @@
+from typing import NamedTuple
+
+from app.engine.keys import MODIFIER_KEYS, MOUSE_BUTTONS, VK_MAP
+from app.models.mapping_item import MAX_TURBO_HZ, MappingItem
+
+KEY_DOWN = 0
+KEY_UP = 1
+MOUSE_DOWN = 2
+MOUSE_UP = 3
+MOUSE_MOVE = 4
+
+DEFAULT_ACTION_DELAY = 0.05
+LOOP_INTERVAL = 0.01
+TURBO_MIN_GAP = 0.01
+
+MODIFIER_VKS = frozenset(VK_MAP[key] for key in MODIFIER_KEYS)
+
+
+class PlanStep(NamedTuple):
+    op: int
+    code: int
+    wait: float
+
+
+Plan = tuple[PlanStep, ...]
+
+
+def turbo_period(mapping: MappingItem) -> float:
+    return 1 / min(max(mapping.turbo_hz, 1), MAX_TURBO_HZ)
+
+
+def key_hold(mapping: MappingItem) -> float:
+    hold = max(mapping.hold_ms, 0) / 1000
+    if mapping.turbo:
+        period = turbo_period(mapping)
+        return min(hold, period - min(TURBO_MIN_GAP, period / 2))
+    return hold
+
+
+def action_delay(mapping: MappingItem) -> float:
+    if mapping.turbo:
+        return turbo_period(mapping) - key_hold(mapping)
+    if mapping.delay_ms > 0:
+        return mapping.delay_ms / 1000
+    return DEFAULT_ACTION_DELAY
+
+
+def plan_duration(plan: Plan) -> float:
+    return sum(step.wait for step in plan)
+
+
+def plan_presses(plan: Plan) -> int:
+    return sum(
+        1
+        for step in plan
+        if step.op == MOUSE_DOWN or (step.op == KEY_DOWN and step.code not in MODIFIER_VKS)
+    )
+
+
+def loop_delay(mapping: MappingItem, plan: Plan, played: float) -> float:
+    if mapping.turbo:
+        return max(turbo_period(mapping) * max(plan_presses(plan), 1) - played, 0.0)
+    return max(mapping.delay_ms / 1000, LOOP_INTERVAL)
+
+
+def compile_direct(mapping: MappingItem) -> tuple[Plan, Plan]:
+    presses: list[tuple[int, int]] = []
+    for event in mapping.target:
+        if event.event_type == "keyboard":
+            vk = VK_MAP.get(event.value)
+            if vk:
+                presses.append((KEY_DOWN, vk))
+        elif event.event_type == "mouse":
+            button = MOUSE_BUTTONS.get(event.value)
+            if button:
+                presses.append((MOUSE_DOWN, button))
+    down = tuple(PlanStep(op, code, 0.0) for op, code in presses)
+    up = tuple(PlanStep(op + 1, code, 0.0) for op, code in reversed(presses))
+    return down, up
+
+
+def compile_plan(mapping: MappingItem) -> Plan:
+    modifiers: list[int] = []
+    actions: list[tuple[int, int, int, int]] = []
+    for index, event in enumerate(mapping.target):
+        if event.event_type == "keyboard":
+            vk = VK_MAP.get(event.value)
+            if not vk:
+                continue
+            if event.value in MODIFIER_KEYS:
+                modifiers.append(vk)
+            else:
+                actions.append((KEY_DOWN, KEY_UP, vk, index))
+        elif event.event_type == "mouse":
+            button = MOUSE_BUTTONS.get(event.value)
+            if button:
+                actions.append((MOUSE_DOWN, MOUSE_UP, button, index))
+
+    settle = max(mapping.settle_ms, 0) / 1000
+    steps = [PlanStep(KEY_DOWN, vk, settle) for vk in modifiers]
+
+    hold = key_hold(mapping)
+    gap = action_delay(mapping)
+    for i, (down, up, code, index) in enumerate(actions):
+        timing = mapping.step_timing(index)
+        step_hold = hold if timing.hold_ms is None else max(timing.hold_ms, 0) / 1000
+        step_gap = gap if timing.gap_ms is None else max(timing.gap_ms, 0) / 1000
+        steps.append(PlanStep(down, code, step_hold))
+        steps.append(PlanStep(up, code, step_gap if i < len(actions) - 1 else 0.0))
+
+    for vk in reversed(modifiers):
+        if steps:
+            steps[-1] = steps[-1]._replace(wait=settle)
+        steps.append(PlanStep(KEY_UP, vk, 0.0))
+
+    return tuple(steps)
@@ -0,0 +1,98 @@
+from pynput.keyboard import Key, KeyCode
+from pynput.mouse import Button
+
+from app.engine.keys import MOUSE_BUTTONS, VK_MAP
+
+PYNPUT_KEY_MAP = {
+    "escape": Key.esc, "tab": Key.tab, "backspace": Key.backspace,
+    "enter": Key.enter, "space": Key.space, "delete": Key.delete,
+    "insert": Key.insert, "home": Key.home, "end": Key.end,
+    "page_up": Key.page_up, "page_down": Key.page_down,
+    "up": Key.up, "down": Key.down, "left": Key.left, "right": Key.right,
+    "shift": Key.shift, "ctrl": Key.ctrl, "alt": Key.alt, "meta": Key.cmd,
+    "caps_lock": Key.caps_lock, "num_lock": Key.num_lock,
+    "scroll_lock": Key.scroll_lock,
+    "f1": Key.f1, "f2": Key.f2, "f3": Key.f3, "f4": Key.f4,
+    "f5": Key.f5, "f6": Key.f6, "f7": Key.f7, "f8": Key.f8,
+    "f9": Key.f9, "f10": Key.f10, "f11": Key.f11, "f12": Key.f12,
+    "print_screen": getattr(Key, "print_screen", None),
+    "pause": getattr(Key, "pause", None),
+}
+
+CHAR_VALUES = {
+    "minus": "-", "equal": "=", "bracket_left": "[", "bracket_right": "]",
+    "backslash": "\\", "semicolon": ";", "apostrophe": "'", "comma": ",",
+    "period": ".", "slash": "/", "grave": "`",
+}
+
+CHAR_NAMES = {char: value for value, char in CHAR_VALUES.items()}
+
+KEY_NAMES = {
+    Key.esc: "escape", Key.tab: "tab", Key.backspace: "backspace",
+    Key.enter: "enter", Key.space: "space", Key.delete: "delete",
+    Key.insert: "insert", Key.home: "home", Key.end: "end",
+    Key.page_up: "page_up", Key.page_down: "page_down",
+    Key.up: "up", Key.down: "down", Key.left: "left", Key.right: "right",
+    Key.shift: "shift", Key.shift_l: "shift", Key.shift_r: "shift",
+    Key.ctrl: "ctrl", Key.ctrl_l: "ctrl", Key.ctrl_r: "ctrl",
+    Key.alt: "alt", Key.alt_l: "alt", Key.alt_r: "alt",
+    Key.cmd: "meta", Key.cmd_l: "meta", Key.cmd_r: "meta",
+    Key.caps_lock: "caps_lock", Key.num_lock: "num_lock",
+    Key.scroll_lock: "scroll_lock",
+    Key.f1: "f1", Key.f2: "f2", Key.f3: "f3", Key.f4: "f4",
+    Key.f5: "f5", Key.f6: "f6", Key.f7: "f7", Key.f8: "f8",
+    Key.f9: "f9", Key.f10: "f10", Key.f11: "f11", Key.f12: "f12",
+}
+
+BUTTON_VALUES = {
+    Button.left: "mouse_left",
+    Button.right: "mouse_right",
+    Button.middle: "mouse_middle",
+}
+
+
+def value_to_pynput_key(value: str):
+    if value in PYNPUT_KEY_MAP:
+        return PYNPUT_KEY_MAP[value]
+    if value.startswith("num_") and len(value) == 5 and value[4].isdigit():
+        return KeyCode.from_vk(96 + int(value[4]))
+    if value in CHAR_VALUES:
+        return KeyCode.from_char(CHAR_VALUES[value])
+    if len(value) == 1:
+        return KeyCode.from_char(value)
+    return None
+
+
+def pynput_keys_by_vk() -> dict:
+    keys = {}
+    for value, vk in VK_MAP.items():
+        key = value_to_pynput_key(value)
+        if key is not None:
+            keys.setdefault(vk, key)
+    return keys
+
+
+def pynput_buttons_by_code() -> dict:
+    return {MOUSE_BUTTONS[value]: button for button, value in BUTTON_VALUES.items()}
+
+
+def normalize_key(key) -> str | None:
+    if isinstance(key, Key):
+        return KEY_NAMES.get(key)
+    if isinstance(key, KeyCode):
+        if key.vk and 96 <= key.vk <= 105:
+            return f"num_{key.vk - 96}"
+        if key.vk == 106:
+            return "num_multiply"
+        if key.vk == 107:
+            return "num_plus"
+        if key.vk == 109:
+            return "num_minus"
+        if key.vk == 110:
+            return "num_decimal"
+        if key.vk == 111:
+            return "num_divide"
+        if key.char:
+            char = key.char.lower()
+            return CHAR_NAMES.get(char, char)
+    return None
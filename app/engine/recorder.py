@@ -0,0 +1,122 @@
+import struct
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Iterator
+
+from app.engine.plan import KEY_DOWN, KEY_UP, MOUSE_DOWN, MOUSE_MOVE, MOUSE_UP
+
+MACRO_EVENT = "macro"
+
+MAGIC = b"KMREC\x01"
+HEADER = struct.Struct("<6sI")
+MOVE_INTERVAL = 0.008
+
+
+class Recording:
+    __slots__ = ("timestamps", "ops", "codes", "xs", "ys", "_origin_ns", "_lock")
+
+    def __init__(self):
+        self.timestamps = array("d")
+        self.ops = array("B")
+        self.codes = array("H")
+        self.xs = array("i")
+        self.ys = array("i")
+        self._origin_ns = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def _buffers(self) -> tuple[array, ...]:
+        return self.timestamps, self.ops, self.codes, self.xs, self.ys
+
+    def __iter__(self) -> Iterator[tuple[float, int, int, int, int]]:
+        return zip(*self._buffers())
+
+    @property
+    def duration(self) -> float:
+        return self.timestamps[-1] if self.timestamps else 0.0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(buffer) * buffer.itemsize for buffer in self._buffers())
+
+    def add(self, timestamp_ns: int, op: int, code: int, x: int = 0, y: int = 0):
+        with self._lock:
+            if not self.ops:
+                self._origin_ns = timestamp_ns
+            self.timestamps.append((timestamp_ns - self._origin_ns) / 1e9)
+            self.ops.append(op)
+            self.codes.append(code)
+            self.xs.append(int(x))
+            self.ys.append(int(y))
+
+    def add_key(self, timestamp_ns: int, vk: int, pressed: bool):
+        self.add(timestamp_ns, KEY_DOWN if pressed else KEY_UP, vk)
+
+    def add_button(self, timestamp_ns: int, code: int, pressed: bool, x: int, y: int):
+        self.add(timestamp_ns, MOUSE_DOWN if pressed else MOUSE_UP, code, x, y)
+
+    def add_move(self, timestamp_ns: int, x: int, y: int):
+        with self._lock:
+            if self.ops and self.ops[-1] == MOUSE_MOVE:
+                elapsed = (timestamp_ns - self._origin_ns) / 1e9 - self.timestamps[-1]
+                if elapsed < MOVE_INTERVAL:
+                    self.xs[-1] = int(x)
+                    self.ys[-1] = int(y)
+                    return
+        self.add(timestamp_ns, MOUSE_MOVE, 0, x, y)
+
+    def truncate(self, length: int):
+        with self._lock:
+            for buffer in self._buffers():
+                del buffer[length:]
+
+    def drop_trailing_click(self):
+        for index in range(len(self.ops) - 1, -1, -1):
+            op = self.ops[index]
+            if op == MOUSE_DOWN:
+                self.truncate(index)
+                return
+            if op != MOUSE_UP and op != MOUSE_MOVE:
+                return
+
+    def to_bytes(self) -> bytes:
+        with self._lock:
+            buffers = self._buffers()
+            if sys.byteorder == "big":
+                buffers = [array(b.typecode, b) for b in buffers]
+                for buffer in buffers:
+                    buffer.byteswap()
+            return HEADER.pack(MAGIC, len(self.ops)) + b"".join(b.tobytes() for b in buffers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Recording":
+        if len(data) < HEADER.size:
+            raise ValueError("Recording file is truncated")
+        magic, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a recording file")
+        recording = cls()
+        offset = HEADER.size
+        for buffer in recording._buffers():
+            end = offset + count * buffer.itemsize
+            if end > len(data):
+                raise ValueError("Recording file is truncated")
+            buffer.frombytes(data[offset:end])
+            if sys.byteorder == "big":
+                buffer.byteswap()
+            offset = end
+        return recording
+
+    def save(self, path: Path):
+        path = Path(path)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(self.to_bytes())
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "Recording":
+        return cls.from_bytes(Path(path).read_bytes())
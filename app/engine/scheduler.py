@@ -0,0 +1,228 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Generator
+
+from app.engine.timing import next_deadline, sleep_until
+
+MacroSteps = Generator[float, None, None]
+
+DEFAULT_MAX_WORKERS = 4
+
+logger = logging.getLogger(__name__)
+
+
+class MacroJob:
+    __slots__ = (
+        "key",
+        "steps",
+        "deadline",
+        "loop",
+        "cancelled",
+        "executing",
+        "successor",
+        "blockers",
+    )
+
+    def __init__(self, key: str | None, steps: MacroSteps, deadline: float, loop: bool = False):
+        self.key = key
+        self.steps = steps
+        self.deadline = deadline
+        self.loop = loop
+        self.cancelled = False
+        self.executing = False
+        self.successor: MacroJob | None = None
+        self.blockers = 0
+
+
+class MacroScheduler:
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, spin_threshold: float = 0.0):
+        self._max_workers = max(1, max_workers)
+        self._spin_threshold = spin_threshold
+        self._heap: list[tuple[float, int, MacroJob]] = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._workers: list[threading.Thread] = []
+        self._keyed_jobs: dict[str, set[MacroJob]] = {}
+        self._active = 0
+        self._running = False
+        self.errors = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def pending_count(self) -> int:
+        with self._cond:
+            return sum(1 for _, _, job in self._heap if not job.cancelled)
+
+    @property
+    def active_count(self) -> int:
+        return self._active
+
+    @property
+    def loop_count(self) -> int:
+        with self._cond:
+            return sum(1 for jobs in self._keyed_jobs.values() if any(j.loop for j in jobs))
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._workers = [
+                threading.Thread(target=self._worker, name=f"macro-worker-{i}", daemon=True)
+                for i in range(self._max_workers)
+            ]
+        for worker in self._workers:
+            worker.start()
+
+    def shutdown(self):
+        self.cancel_all()
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            workers, self._workers = self._workers, []
+        current = threading.current_thread()
+        for worker in workers:
+            if worker is not current:
+                worker.join(timeout=1.0)
+
+    def submit(
+        self, steps: MacroSteps, key: str | None = None, delay: float = 0.0, loop: bool = False
+    ) -> MacroJob:
+        job = MacroJob(key, steps, time.perf_counter() + delay, loop)
+        with self._cond:
+            if key is not None:
+                self._keyed_jobs.setdefault(key, set()).add(job)
+            heapq.heappush(self._heap, (job.deadline, next(self._sequence), job))
+            self._cond.notify()
+        return job
+
+    def has_job(self, key: str) -> bool:
+        with self._cond:
+            return bool(self._keyed_jobs.get(key))
+
+    def _cancel_locked(self, key: str) -> tuple[list[MacroJob], list[MacroJob]]:
+        jobs = self._keyed_jobs.pop(key, set())
+        closed = []
+        executing = []
+        for job in jobs:
+            job.cancelled = True
+            if job.executing:
+                executing.append(job)
+            else:
+                closed.append(job)
+        if closed:
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cond.notify_all()
+        return closed, executing
+
+    def cancel(self, key: str):
+        with self._cond:
+            closed, _ = self._cancel_locked(key)
+        for job in closed:
+            job.steps.close()
+
+    def replace(self, key: str, steps: MacroSteps) -> MacroJob:
+        job = MacroJob(key, steps, time.perf_counter())
+        with self._cond:
+            closed, executing = self._cancel_locked(key)
+            self._keyed_jobs.setdefault(key, set()).add(job)
+            for previous in executing:
+                previous.successor = job
+            job.blockers = len(executing)
+            if not executing:
+                heapq.heappush(self._heap, (job.deadline, next(self._sequence), job))
+                self._cond.notify()
+        for previous in closed:
+            previous.steps.close()
+        return job
+
+    def cancel_all(self):
+        with self._cond:
+            queued = [job for _, _, job in self._heap]
+            self._heap.clear()
+            for jobs in self._keyed_jobs.values():
+                for job in jobs:
+                    job.cancelled = True
+            self._keyed_jobs.clear()
+            self._cond.notify_all()
+        for job in queued:
+            job.cancelled = True
+            job.steps.close()
+
+    def _finish(self, job: MacroJob):
+        if job.key is not None:
+            jobs = self._keyed_jobs.get(job.key)
+            if jobs is not None:
+                jobs.discard(job)
+                if not jobs:
+                    del self._keyed_jobs[job.key]
+
+    def _next_job(self) -> MacroJob | None:
+        with self._cond:
+            while self._running:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - time.perf_counter()
+                if wait > self._spin_threshold:
+                    self._cond.wait(wait - self._spin_threshold)
+                    continue
+                _, _, job = heapq.heappop(self._heap)
+                if job.cancelled:
+                    self._finish(job)
+                else:
+                    job.executing = True
+                    self._active += 1
+                return job
+        return None
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            if job.cancelled:
+                job.steps.close()
+                continue
+            if self._spin_threshold:
+                sleep_until(job.deadline, self._spin_threshold)
+            try:
+                wait = next(job.steps)
+            except StopIteration:
+                wait = None
+            except Exception:
+                wait = None
+                with self._cond:
+                    self.errors += 1
+                logger.exception("Macro job %s failed", job.key or "(unkeyed)")
+            with self._cond:
+                self._active -= 1
+                job.executing = False
+                finished = wait is None or job.cancelled or not self._running
+                if finished:
+                    self._finish(job)
+                else:
+                    job.deadline = next_deadline(job.deadline, wait, time.perf_counter())
+                    heapq.heappush(self._heap, (job.deadline, next(self._sequence), job))
+                    self._cond.notify()
+            if finished and wait is not None:
+                job.steps.close()
+            if finished and job.successor is not None:
+                self._release_successor(job)
+
+    def _release_successor(self, job: MacroJob):
+        with self._cond:
+            successor, job.successor = job.successor, None
+            successor.blockers -= 1
+            if successor.blockers or successor.cancelled:
+                return
+            successor.deadline = time.perf_counter()
+            heapq.heappush(self._heap, (successor.deadline, next(self._sequence), successor))
+            self._cond.notify()
@@ -0,0 +1,126 @@
+import math
+import time
+from array import array
+
+PRECISE_SPIN_THRESHOLD = 0.002
+LATE_RESET = 0.05
+
+
+def sleep_until(deadline: float, spin_threshold: float = 0.0):
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return
+        if remaining > spin_threshold:
+            time.sleep(remaining - spin_threshold)
+        else:
+            time.sleep(0)
+
+
+def next_deadline(previous: float, wait: float, now: float) -> float:
+    deadline = previous + wait
+    if deadline < now - LATE_RESET:
+        return now
+    return deadline
+
+
+class LoopTimingStats:
+    __slots__ = (
+        "nominal_period",
+        "iterations",
+        "_first",
+        "_last",
+        "_mean",
+        "_m2",
+        "_max_error",
+    )
+
+    def __init__(self, nominal_period: float):
+        self.nominal_period = nominal_period
+        self.iterations = 0
+        self._first = 0.0
+        self._last = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._max_error = 0.0
+
+    def record(self, timestamp: float):
+        self.iterations += 1
+        if self.iterations == 1:
+            self._first = self._last = timestamp
+            return
+        period = timestamp - self._last
+        self._last = timestamp
+        count = self.iterations - 1
+        delta = period - self._mean
+        self._mean += delta / count
+        self._m2 += delta * (period - self._mean)
+        error = abs(period - self.nominal_period)
+        if error > self._max_error:
+            self._max_error = error
+
+    @property
+    def mean_period(self) -> float:
+        return self._mean
+
+    @property
+    def rate_hz(self) -> float:
+        return 1.0 / self._mean if self._mean > 0 else 0.0
+
+    @property
+    def jitter(self) -> float:
+        count = self.iterations - 1
+        return math.sqrt(self._m2 / count) if count > 1 else 0.0
+
+    @property
+    def max_period_error(self) -> float:
+        return self._max_error
+
+    @property
+    def drift(self) -> float:
+        if self.iterations < 2:
+            return 0.0
+        return (self._last - self._first) - (self.iterations - 1) * self.nominal_period
+
+    def to_dict(self) -> dict:
+        return {
+            "iterations": self.iterations,
+            "nominal_period_ms": self.nominal_period * 1000,
+            "mean_period_ms": self.mean_period * 1000,
+            "rate_hz": self.rate_hz,
+            "jitter_ms": self.jitter * 1000,
+            "max_period_error_ms": self.max_period_error * 1000,
+            "drift_ms": self.drift * 1000,
+        }
+
+
+class LatencyRecorder:
+    __slots__ = ("_samples", "_size", "count", "max_ns", "_total_ns")
+
+    def __init__(self, size: int = 4096):
+        self._samples = array("q", bytes(8 * size))
+        self._size = size
+        self.count = 0
+        self.max_ns = 0
+        self._total_ns = 0
+
+    def record(self, elapsed_ns: int):
+        self._samples[self.count % self._size] = elapsed_ns
+        self.count += 1
+        self._total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def percentile(self, fraction: float) -> int:
+        window = sorted(self._samples[: min(self.count, self._size)])
+        if not window:
+            return 0
+        return window[min(len(window) - 1, int(len(window) * fraction))]
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_us": self._total_ns / self.count / 1000 if self.count else 0.0,
+            "p99_us": self.percentile(0.99) / 1000,
+            "max_us": self.max_ns / 1000,
+        }
@@ -0,0 +1,119 @@
+import ctypes
+import threading
+from ctypes import wintypes
+from typing import Callable
+
+from app.engine.backends import INJECTED_MARKER, IS_WINDOWS
+
+WH_KEYBOARD_LL = 13
+HC_ACTION = 0
+WM_QUIT = 0x0012
+LLKHF_UP = 0x80
+
+KeyHandler = Callable[[int, bool], bool]
+
+ULONG_PTR = ctypes.c_ulonglong if ctypes.sizeof(ctypes.c_void_p) == 8 else ctypes.c_ulong
+
+
+class KBDLLHOOKSTRUCT(ctypes.Structure):
+    _fields_ = [
+        ("vkCode", ctypes.c_uint32),
+        ("scanCode", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("time", ctypes.c_uint32),
+        ("dwExtraInfo", ULONG_PTR),
+    ]
+
+
+def dispatch_hook_data(handler: KeyHandler, lparam: int) -> bool:
+    data = KBDLLHOOKSTRUCT.from_address(lparam)
+    if data.dwExtraInfo == INJECTED_MARKER:
+        return False
+    return handler(data.vkCode & 0xFF, not data.flags & LLKHF_UP)
+
+
+if IS_WINDOWS:
+    LRESULT = wintypes.LPARAM
+    HOOKPROC = ctypes.WINFUNCTYPE(LRESULT, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+    user32.SetWindowsHookExW.argtypes = (
+        ctypes.c_int,
+        HOOKPROC,
+        wintypes.HINSTANCE,
+        wintypes.DWORD,
+    )
+    user32.SetWindowsHookExW.restype = wintypes.HHOOK
+    user32.CallNextHookEx.argtypes = (
+        wintypes.HHOOK,
+        ctypes.c_int,
+        wintypes.WPARAM,
+        wintypes.LPARAM,
+    )
+    user32.CallNextHookEx.restype = LRESULT
+    user32.UnhookWindowsHookEx.argtypes = (wintypes.HHOOK,)
+    user32.GetMessageW.argtypes = (
+        ctypes.POINTER(wintypes.MSG),
+        wintypes.HWND,
+        wintypes.UINT,
+        wintypes.UINT,
+    )
+    user32.PostThreadMessageW.argtypes = (
+        wintypes.DWORD,
+        wintypes.UINT,
+        wintypes.WPARAM,
+        wintypes.LPARAM,
+    )
+    kernel32.GetModuleHandleW.argtypes = (wintypes.LPCWSTR,)
+    kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+
+
+class LowLevelKeyboardHook:
+    def __init__(self, handler: KeyHandler):
+        self._handler = handler
+        self._callback = HOOKPROC(self._proc)
+        self._thread: threading.Thread | None = None
+        self._thread_id = 0
+        self._ready = threading.Event()
+        self._error = 0
+
+    def _proc(self, code: int, wparam: int, lparam: int) -> int:
+        if code == HC_ACTION and dispatch_hook_data(self._handler, lparam):
+            return 1
+        return user32.CallNextHookEx(None, code, wparam, lparam)
+
+    def _run(self):
+        self._thread_id = kernel32.GetCurrentThreadId()
+        hook = user32.SetWindowsHookExW(
+            WH_KEYBOARD_LL, self._callback, kernel32.GetModuleHandleW(None), 0
+        )
+        if not hook:
+            self._error = ctypes.get_last_error()
+            self._ready.set()
+            return
+        self._ready.set()
+        msg = wintypes.MSG()
+        try:
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                pass
+        finally:
+            user32.UnhookWindowsHookEx(hook)
+
+    def start(self):
+        self._ready.clear()
+        self._error = 0
+        self._thread = threading.Thread(target=self._run, name="keyboard-hook", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            self._thread = None
+            raise ctypes.WinError(self._error)
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        thread.join(1.0)
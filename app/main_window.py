@@ -1,8 +1,15 @@
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QTabWidget
 
+from app.engine.backends import IS_MACOS
 from app.tabs.windows_tab import WindowsTab
 from app.tabs.macos_tab import MacOSTab
+from app.widgets.diagnostics_view import DiagnosticsStatus
+
+TABS = (
+    ("windows", "Windows 11", WindowsTab),
+    ("macos", "macOS", MacOSTab),
+)
 
 
 class MainWindow(QMainWindow):
@@ -17,9 +24,43 @@ class MainWindow(QMainWindow):
 
         layout = QVBoxLayout(central_widget)
 
+        self._tabs: dict[str, WindowsTab | MacOSTab] = {}
+        self._diagnostics: DiagnosticsStatus | None = None
         self.tab_widget = QTabWidget()
-        self.tab_widget.addTab(WindowsTab(), "Windows 11")
-        self.tab_widget.addTab(MacOSTab(), "macOS")
+        for _, label, _ in TABS:
+            self.tab_widget.addTab(QWidget(), label)
         layout.addWidget(self.tab_widget)
 
+        current = 1 if IS_MACOS else 0
+        first_tab = self._ensure_tab(current)
+        self.tab_widget.currentChanged.connect(self._ensure_tab)
+
+        self._diagnostics = DiagnosticsStatus(
+            {TABS[current][0]: first_tab.engine.metrics},
+            first_tab.profiles.config_dir / "metrics.prom",
+        )
+        self.statusBar().addPermanentWidget(self._diagnostics)
         self.statusBar().showMessage("Ready")
+
+    def _ensure_tab(self, index: int):
+        name, label, factory = TABS[index]
+        tab = self._tabs.get(name)
+        if tab is not None:
+            return tab
+        tab = self._tabs[name] = factory()
+        self.tab_widget.blockSignals(True)
+        placeholder = self.tab_widget.widget(index)
+        self.tab_widget.removeTab(index)
+        placeholder.deleteLater()
+        self.tab_widget.insertTab(index, tab, label)
+        self.tab_widget.setCurrentIndex(index)
+        self.tab_widget.blockSignals(False)
+        if self._diagnostics is not None:
+            self._diagnostics.add_engine(name, tab.engine.metrics)
+        return tab
+
+    def closeEvent(self, event):
+        self._diagnostics.shutdown()
+        for tab in self._tabs.values():
+            tab.profiles.flush()
+        super().closeEvent(event)
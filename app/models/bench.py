@@ -0,0 +1,80 @@
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from app.engine.keys import MODIFIER_KEYS, VK_MAP
+from app.models.input_event import InputEvent
+from app.models.mapping_item import MappingItem
+
+
+def _library(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    keys = sorted(VK_MAP)
+    modifiers = sorted(MODIFIER_KEYS)
+    buttons = ["mouse_left", "mouse_right", "mouse_middle"]
+    data = []
+    for _ in range(count):
+        target = [
+            {"event_type": "keyboard", "value": value}
+            for value in rng.sample(keys, rng.randint(1, 6))
+        ]
+        if rng.random() < 0.2:
+            target.append({"event_type": "mouse", "value": rng.choice(buttons)})
+        data.append(
+            MappingItem(
+                source=InputEvent.of("keyboard", rng.choice(keys)),
+                target=[],
+                source_modifiers=rng.sample(modifiers, rng.randint(0, 2)),
+            ).to_dict()
+            | {"target": target}
+        )
+    return json.loads(json.dumps(data))
+
+
+def _uncached(data: dict) -> MappingItem:
+    item = MappingItem.from_dict({**data, "target": []})
+    item.target = [
+        InputEvent(event_type=event["event_type"], value=event["value"])
+        for event in data["target"]
+    ]
+    return item
+
+
+def _measure(data: list[dict], load) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = [load(entry) for entry in data]
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    events = [event for item in items for event in item.target]
+    return {
+        "load_ms": elapsed * 1000,
+        "retained_kb": retained / 1024,
+        "peak_kb": peak / 1024,
+        "bytes_per_mapping": retained / len(items),
+        "target_events": len(events),
+        "distinct_event_objects": len({id(event) for event in events}),
+    }
+
+
+def bench_models(count: int = 20_000) -> dict:
+    data = _library(count)
+    return {
+        "mappings": count,
+        "interned": _measure(data, MappingItem.from_dict),
+        "uncached": _measure(data, _uncached),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mapping model memory benchmark")
+    parser.add_argument("--count", type=int, default=20_000)
+    args = parser.parse_args()
+    print(json.dumps(bench_models(args.count), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,14 @@
+import sys
 from dataclasses import dataclass
 
+MOUSE_NAMES = {
+    "mouse_left": "Mouse Left",
+    "mouse_right": "Mouse Right",
+    "mouse_middle": "Mouse Middle",
+}
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class InputEvent:
     event_type: str
     value: str
@@ -9,16 +16,24 @@ class InputEvent:
     def to_dict(self) -> dict:
         return {"event_type": self.event_type, "value": self.value}
 
+    @classmethod
+    def of(cls, event_type: str, value: str) -> "InputEvent":
+        event = _EVENTS.get((event_type, value))
+        if event is None:
+            event = cls(event_type=sys.intern(event_type), value=sys.intern(value))
+            event = _EVENTS.setdefault((event.event_type, event.value), event)
+        return event
+
     @classmethod
     def from_dict(cls, data: dict) -> "InputEvent":
-        return cls(event_type=data["event_type"], value=data["value"])
+        return cls.of(data["event_type"], data["value"])
 
     def display_name(self) -> str:
+        if self.event_type == "macro":
+            return f"Macro: {self.value}"
         if self.event_type == "mouse":
-            names = {
-                "mouse_left": "Mouse Left",
-                "mouse_right": "Mouse Right",
-                "mouse_middle": "Mouse Middle",
-            }
-            return names.get(self.value, self.value)
+            return MOUSE_NAMES.get(self.value, self.value)
         return self.value.replace("_", " ").title()
+
+
+_EVENTS: dict[tuple[str, str], InputEvent] = {}
@@ -1,12 +1,50 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
 from uuid import uuid4
 
 from app.models.input_event import InputEvent
 
+DEFAULT_HOLD_MS = 30.0
+DEFAULT_SETTLE_MS = 20.0
+DEFAULT_TURBO_HZ = 25
+MAX_TURBO_HZ = 1000
 
-@dataclass
+TRIGGER_ONCE = "once"
+TRIGGER_REPEAT = "repeat"
+TRIGGER_DROP = "drop"
+TRIGGER_QUEUE = "queue"
+TRIGGER_RESTART = "restart"
+TRIGGER_COALESCE = "coalesce"
+TRIGGER_POLICIES = (
+    TRIGGER_ONCE,
+    TRIGGER_REPEAT,
+    TRIGGER_DROP,
+    TRIGGER_QUEUE,
+    TRIGGER_RESTART,
+    TRIGGER_COALESCE,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class StepTiming:
+    hold_ms: float | None = None
+    gap_ms: float | None = None
+
+    def to_dict(self) -> dict:
+        return {"hold_ms": self.hold_ms, "gap_ms": self.gap_ms}
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> StepTiming:
+        data = data or {}
+        return cls(hold_ms=data.get("hold_ms"), gap_ms=data.get("gap_ms"))
+
+
+NO_STEP_TIMING = StepTiming()
+
+
+@dataclass(slots=True)
 class MappingItem:
     source: InputEvent
     target: list[InputEvent]
@@ -16,6 +54,24 @@ class MappingItem:
     turbo: bool = False
     loop: bool = False
     stop_key: InputEvent | None = None
+    batched: bool = False
+    source_modifiers: list[str] = field(default_factory=list)
+    hold_ms: float = DEFAULT_HOLD_MS
+    settle_ms: float = DEFAULT_SETTLE_MS
+    turbo_hz: int = DEFAULT_TURBO_HZ
+    step_timings: list[StepTiming] = field(default_factory=list)
+    trigger_policy: str = TRIGGER_ONCE
+    direct: bool = False
+
+    def step_timing(self, index: int) -> StepTiming:
+        if index < len(self.step_timings):
+            return self.step_timings[index]
+        return NO_STEP_TIMING
+
+    def source_display_name(self) -> str:
+        names = [InputEvent.of("keyboard", m).display_name() for m in self.source_modifiers]
+        names.append(self.source.display_name())
+        return " + ".join(names)
 
     def to_dict(self) -> dict:
         return {
@@ -27,11 +83,20 @@ class MappingItem:
             "turbo": self.turbo,
             "loop": self.loop,
             "stop_key": self.stop_key.to_dict() if self.stop_key else None,
+            "batched": self.batched,
+            "source_modifiers": list(self.source_modifiers),
+            "hold_ms": self.hold_ms,
+            "settle_ms": self.settle_ms,
+            "turbo_hz": self.turbo_hz,
+            "step_timings": [timing.to_dict() for timing in self.step_timings],
+            "trigger_policy": self.trigger_policy,
+            "direct": self.direct,
         }
 
     @classmethod
     def from_dict(cls, data: dict) -> MappingItem:
         stop_key_data = data.get("stop_key")
+        policy = data.get("trigger_policy", TRIGGER_ONCE)
         return cls(
             id=data["id"],
             source=InputEvent.from_dict(data["source"]),
@@ -41,4 +106,12 @@ class MappingItem:
             turbo=data.get("turbo", False),
             loop=data.get("loop", False),
             stop_key=InputEvent.from_dict(stop_key_data) if stop_key_data else None,
+            batched=data.get("batched", False),
+            source_modifiers=[sys.intern(m) for m in data.get("source_modifiers", [])],
+            hold_ms=data.get("hold_ms", DEFAULT_HOLD_MS),
+            settle_ms=data.get("settle_ms", DEFAULT_SETTLE_MS),
+            turbo_hz=min(max(int(data.get("turbo_hz", DEFAULT_TURBO_HZ)), 1), MAX_TURBO_HZ),
+            step_timings=[StepTiming.from_dict(t) for t in data.get("step_timings", [])],
+            trigger_policy=policy if policy in TRIGGER_POLICIES else TRIGGER_ONCE,
+            direct=data.get("direct", False),
         )
@@ -0,0 +1,107 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+MEASURE_FLAG = "--measure-startup"
+
+
+def peak_rss_kb() -> int:
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+        )
+        return counters.PeakWorkingSetSize // 1024
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def install_startup_timer(window, started: float, imported: float):
+    from PySide6.QtCore import QEvent, QObject, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    constructed = time.perf_counter()
+
+    class StartupTimer(QObject):
+        def __init__(self):
+            super().__init__(window)
+            self._painted = False
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and not self._painted:
+                self._painted = True
+                QTimer.singleShot(0, self._report)
+            return False
+
+        def _report(self):
+            painted = time.perf_counter()
+            print(
+                json.dumps(
+                    {
+                        "import_ms": (imported - started) * 1000,
+                        "window_ms": (constructed - imported) * 1000,
+                        "first_paint_ms": (painted - started) * 1000,
+                        "peak_rss_kb": peak_rss_kb(),
+                    }
+                ),
+                flush=True,
+            )
+            QApplication.quit()
+
+    timer = StartupTimer()
+    window.installEventFilter(timer)
+    return timer
+
+
+def measure(runs: int = 5) -> dict:
+    main_path = Path(__file__).resolve().parent.parent / "main.py"
+    samples = []
+    for _ in range(runs):
+        spawned = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, str(main_path), MEASURE_FLAG],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        sample["process_ms"] = (time.perf_counter() - spawned) * 1000
+        samples.append(sample)
+    medians = {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+    medians["runs"] = runs
+    return medians
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(measure(args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import json
+import tempfile
+import time
+
+from app.models.input_event import InputEvent
+from app.models.mapping_item import MappingItem
+from app.store.mapping_store import MappingStore
+from app.store.sqlite_store import SqliteMappingStore
+
+
+def _mapping(index: int) -> MappingItem:
+    return MappingItem(
+        source=InputEvent.of("keyboard", f"f{index % 12 + 1}"),
+        target=[InputEvent.of("keyboard", "a")],
+    )
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_store(count: int = 10_000, sqlite: bool = False) -> dict:
+    with tempfile.TemporaryDirectory() as config_dir:
+        if sqlite:
+            store = SqliteMappingStore("bench", config_dir=config_dir)
+        else:
+            store = MappingStore("bench", config_dir=config_dir)
+        notifications = []
+        store.add_listener(notifications.append)
+        items = [_mapping(i) for i in range(count)]
+        ids = [item.id for item in items]
+
+        results = {"backend": type(store).__name__, "mappings": count}
+        results["add_ms"] = _timed(lambda: [store.add(item) for item in items])
+        results["flush_ms"] = _timed(store.flush)
+
+        notifications.clear()
+        results["toggle_each_ms"] = _timed(lambda: [store.toggle(i) for i in ids])
+        results["toggle_each_notifications"] = len(notifications)
+
+        notifications.clear()
+        results["set_enabled_many_ms"] = _timed(lambda: store.set_enabled_many(ids, True))
+        results["update_many_ms"] = _timed(lambda: store.update_many(items))
+        results["lookup_all_ms"] = _timed(lambda: [store.get(i) for i in ids])
+        results["delete_many_ms"] = _timed(lambda: store.delete_many(ids[: count // 2]))
+        results["bulk_notifications"] = len(notifications)
+        results["remaining"] = len(store)
+        store.flush()
+        if sqlite:
+            store.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MappingStore benchmark")
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--sqlite", action="store_true", help="benchmark SqliteMappingStore")
+    args = parser.parse_args()
+    print(json.dumps(bench_store(args.count, args.sqlite), indent=2))
+
+
+if __name__ == "__main__":
+    main()
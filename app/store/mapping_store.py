@@ -1,70 +1,172 @@
 import json
+import logging
+import os
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import Callable, Iterable
 
 from app.models.mapping_item import MappingItem
 
+DEFAULT_DEBOUNCE = 0.3
+
+logger = logging.getLogger(__name__)
+
+ChangeListener = Callable[[list[str]], None]
+
+
+def default_config_dir() -> Path:
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent / "config"
+    return Path(__file__).resolve().parent.parent.parent / "config"
+
 
 class MappingStore:
-    def __init__(self, os_type: str):
-        if getattr(sys, "frozen", False):
-            base_dir = Path(sys.executable).parent
-        else:
-            base_dir = Path(__file__).resolve().parent.parent.parent
-        self._config_dir = base_dir / "config"
+    def __init__(
+        self,
+        os_type: str,
+        write_behind: bool = True,
+        debounce: float = DEFAULT_DEBOUNCE,
+        config_dir: Path | None = None,
+    ):
+        self._config_dir = Path(config_dir) if config_dir is not None else default_config_dir()
         self._config_dir.mkdir(exist_ok=True)
         self._file_path = self._config_dir / f"{os_type}_mappings.json"
-        self._mappings: list[MappingItem] = []
+        self._mappings: dict[str, MappingItem] = {}
+        self._listeners: list[ChangeListener] = []
+        self._debounce = debounce
+        self._write_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._writer: threading.Thread | None = None
         self.load()
+        if write_behind:
+            self._writer = threading.Thread(
+                target=self._write_behind, name=f"{os_type}-store-writer", daemon=True
+            )
+            self._writer.start()
+
+    @property
+    def config_dir(self) -> Path:
+        return self._config_dir
+
+    def add_listener(self, listener: ChangeListener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: ChangeListener):
+        self._listeners.remove(listener)
 
     def load(self):
         if self._file_path.exists():
             data = json.loads(self._file_path.read_text(encoding="utf-8"))
-            self._mappings = [MappingItem.from_dict(item) for item in data]
+            items = (MappingItem.from_dict(item) for item in data)
+            self._mappings = {item.id: item for item in items}
         else:
-            self._mappings = []
+            self._mappings = {}
+
+    def _write(self):
+        data = [item.to_dict() for item in list(self._mappings.values())]
+        tmp_path = self._file_path.with_name(self._file_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, ensure_ascii=False, indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._file_path)
 
     def save(self):
-        data = [item.to_dict() for item in self._mappings]
-        self._file_path.write_text(
-            json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
+        with self._write_lock:
+            self._write()
 
-    def get_all(self) -> list[MappingItem]:
+    def flush(self):
+        with self._write_lock:
+            if not self._dirty.is_set():
+                return
+            self._dirty.clear()
+            try:
+                self._write()
+            except BaseException:
+                self._dirty.set()
+                raise
+
+    def _commit(self, changed_ids: list[str]):
+        if not changed_ids:
+            return
+        if self._writer is None:
+            self.save()
+        else:
+            self._dirty.set()
+        for listener in list(self._listeners):
+            listener(changed_ids)
+
+    def _write_behind(self):
+        while True:
+            self._dirty.wait()
+            time.sleep(self._debounce)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Writing %s failed, will retry", self._file_path)
+
+    def __len__(self) -> int:
+        return len(self._mappings)
+
+    def get(self, item_id: str) -> MappingItem | None:
+        return self._mappings.get(item_id)
+
+    def ids(self) -> list[str]:
         return list(self._mappings)
 
+    def get_all(self) -> list[MappingItem]:
+        return list(self._mappings.values())
+
+    def get_enabled(self) -> list[MappingItem]:
+        return [item for item in self._mappings.values() if item.enabled]
+
     def add(self, item: MappingItem):
-        self._mappings.append(item)
-        self.save()
+        self._mappings[item.id] = item
+        self._commit([item.id])
 
     def update(self, item: MappingItem):
-        for i, existing in enumerate(self._mappings):
-            if existing.id == item.id:
-                self._mappings[i] = item
-                break
-        self.save()
+        self.update_many([item])
+
+    def update_many(self, items: Iterable[MappingItem]):
+        changed = []
+        for item in items:
+            if item.id in self._mappings:
+                self._mappings[item.id] = item
+                changed.append(item.id)
+        self._commit(changed)
 
     def delete(self, item_id: str):
-        self._mappings = [m for m in self._mappings if m.id != item_id]
-        self.save()
+        self.delete_many([item_id])
+
+    def delete_many(self, item_ids: Iterable[str]):
+        changed = [
+            item_id for item_id in item_ids if self._mappings.pop(item_id, None) is not None
+        ]
+        self._commit(changed)
+
+    def set_enabled_many(self, item_ids: Iterable[str], enabled: bool):
+        changed = []
+        for item_id in item_ids:
+            item = self._mappings.get(item_id)
+            if item is not None and item.enabled != enabled:
+                item.enabled = enabled
+                changed.append(item_id)
+        self._commit(changed)
+
+    def _flip(self, item_id: str, field: str):
+        item = self._mappings.get(item_id)
+        if item is None:
+            return
+        setattr(item, field, not getattr(item, field))
+        self._commit([item_id])
 
     def toggle(self, item_id: str):
-        for item in self._mappings:
-            if item.id == item_id:
-                item.enabled = not item.enabled
-                break
-        self.save()
+        self._flip(item_id, "enabled")
 
     def toggle_turbo(self, item_id: str):
-        for item in self._mappings:
-            if item.id == item_id:
-                item.turbo = not item.turbo
-                break
-        self.save()
+        self._flip(item_id, "turbo")
 
     def toggle_loop(self, item_id: str):
-        for item in self._mappings:
-            if item.id == item_id:
-                item.loop = not item.loop
-                break
-        self.save()
+        self._flip(item_id, "loop")
@@ -0,0 +1,177 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable
+
+from app.models.mapping_item import MappingItem
+from app.store.mapping_store import MappingStore, default_config_dir
+from app.store.sqlite_store import SqliteMappingStore
+
+DEFAULT_PROFILE = "Default"
+
+ProfileListener = Callable[[str, list[str]], None]
+
+
+def open_mapping_store(
+    key: str, write_behind: bool = True, config_dir: Path | None = None
+) -> MappingStore | SqliteMappingStore:
+    config_dir = Path(config_dir) if config_dir is not None else default_config_dir()
+    if (config_dir / f"{key}_mappings.db").exists():
+        return SqliteMappingStore(key, config_dir=config_dir)
+    return MappingStore(key, write_behind, config_dir=config_dir)
+
+
+class ProfileStore:
+    def __init__(
+        self, os_type: str, write_behind: bool = True, config_dir: Path | None = None
+    ):
+        self._os_type = os_type
+        self._write_behind = write_behind
+        default = open_mapping_store(os_type, write_behind, config_dir)
+        self._config_dir = default.config_dir
+        self._file_path = self._config_dir / f"{os_type}_profiles.json"
+        self._keys: dict[str, str] = {DEFAULT_PROFILE: os_type}
+        self._stores: dict[str, MappingStore | SqliteMappingStore] = {DEFAULT_PROFILE: default}
+        self._listeners: list[ProfileListener] = []
+        self._active = DEFAULT_PROFILE
+        self._fallback = DEFAULT_PROFILE
+        self._switch_key: str | None = None
+        self._switch_modifiers: list[str] = []
+        self._app_rules: dict[str, str] = {}
+        self.load()
+        default.add_listener(lambda ids: self._notify(DEFAULT_PROFILE, ids))
+
+    @property
+    def config_dir(self) -> Path:
+        return self._config_dir
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._keys)
+
+    @property
+    def active(self) -> str:
+        return self._active
+
+    @property
+    def fallback(self) -> str:
+        return self._fallback
+
+    @property
+    def active_store(self) -> MappingStore | SqliteMappingStore:
+        return self.store(self._active)
+
+    @property
+    def switch_key(self) -> str | None:
+        return self._switch_key
+
+    @property
+    def switch_modifiers(self) -> list[str]:
+        return list(self._switch_modifiers)
+
+    @property
+    def app_rules(self) -> dict[str, str]:
+        return dict(self._app_rules)
+
+    def add_listener(self, listener: ProfileListener):
+        self._listeners.append(listener)
+
+    def _notify(self, name: str, changed_ids: list[str]):
+        for listener in list(self._listeners):
+            listener(name, changed_ids)
+
+    def load(self):
+        if not self._file_path.exists():
+            return
+        data = json.loads(self._file_path.read_text(encoding="utf-8"))
+        for entry in data.get("profiles", []):
+            self._keys.setdefault(entry["name"], entry["key"])
+        if data.get("active") in self._keys:
+            self._active = self._fallback = data["active"]
+        self._switch_key = data.get("switch_key")
+        self._switch_modifiers = list(data.get("switch_modifiers", []))
+        self._app_rules = {
+            app: name for app, name in data.get("app_rules", {}).items() if name in self._keys
+        }
+
+    def save(self):
+        data = {
+            "profiles": [{"name": name, "key": key} for name, key in self._keys.items()],
+            "active": self._fallback,
+            "switch_key": self._switch_key,
+            "switch_modifiers": self._switch_modifiers,
+            "app_rules": self._app_rules,
+        }
+        tmp_path = self._file_path.with_name(self._file_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self._file_path)
+
+    def store(self, name: str) -> MappingStore | SqliteMappingStore:
+        store = self._stores.get(name)
+        if store is None:
+            store = open_mapping_store(self._keys[name], self._write_behind, self._config_dir)
+            store.add_listener(lambda ids: self._notify(name, ids))
+            self._stores[name] = store
+        return store
+
+    def mappings_by_profile(self) -> dict[str, list[MappingItem]]:
+        return {name: self.store(name).get_enabled() for name in self._keys}
+
+    def add(self, name: str) -> MappingStore | SqliteMappingStore:
+        name = name.strip()
+        if not name or name in self._keys:
+            raise ValueError(f"Profile name '{name}' is empty or already in use")
+        slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") or "profile"
+        key = f"{self._os_type}_{slug}"
+        taken = set(self._keys.values())
+        suffix = 2
+        while key in taken:
+            key = f"{self._os_type}_{slug}_{suffix}"
+            suffix += 1
+        self._keys[name] = key
+        self.save()
+        return self.store(name)
+
+    def remove(self, name: str):
+        if name == DEFAULT_PROFILE or name not in self._keys:
+            return
+        store = self._stores.pop(name, None)
+        key = self._keys.pop(name)
+        if isinstance(store, SqliteMappingStore):
+            store.close()
+        elif store is not None:
+            store.flush()
+        (self._config_dir / f"{key}_mappings.json").unlink(missing_ok=True)
+        (self._config_dir / f"{key}_mappings.db").unlink(missing_ok=True)
+        if self._fallback == name:
+            self._fallback = DEFAULT_PROFILE
+        if self._active == name:
+            self._active = self._fallback
+        self._app_rules = {app: p for app, p in self._app_rules.items() if p != name}
+        self.save()
+
+    def set_active(self, name: str, persist: bool = True):
+        if name not in self._keys:
+            return
+        self._active = name
+        if persist and name != self._fallback:
+            self._fallback = name
+            self.save()
+
+    def set_switch_key(self, value: str | None, modifiers: list[str] | None = None):
+        self._switch_key = value
+        self._switch_modifiers = list(modifiers or [])
+        self.save()
+
+    def set_app_rules(self, rules: dict[str, str]):
+        self._app_rules = {
+            app.strip().lower(): name
+            for app, name in rules.items()
+            if app.strip() and name in self._keys
+        }
+        self.save()
+
+    def flush(self):
+        for store in self._stores.values():
+            store.flush()
@@ -0,0 +1,64 @@
+import re
+import threading
+from pathlib import Path
+
+from app.engine.recorder import Recording
+from app.store.mapping_store import default_config_dir
+
+RECORDINGS_DIR = "recordings"
+RECORDING_SUFFIX = ".rec"
+
+
+def recording_slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.strip().lower()).strip("_")
+
+
+class RecordingStore:
+    def __init__(self, config_dir: Path | None = None):
+        config_dir = Path(config_dir) if config_dir is not None else default_config_dir()
+        self._dir = config_dir / RECORDINGS_DIR
+        self._lock = threading.Lock()
+        self._cache: dict[str, tuple[int, Recording]] = {}
+
+    @property
+    def directory(self) -> Path:
+        return self._dir
+
+    def path(self, name: str) -> Path:
+        return self._dir / f"{name}{RECORDING_SUFFIX}"
+
+    def names(self) -> list[str]:
+        if not self._dir.exists():
+            return []
+        return sorted(path.stem for path in self._dir.glob(f"*{RECORDING_SUFFIX}"))
+
+    def save(self, name: str, recording: Recording) -> str:
+        slug = recording_slug(name)
+        if not slug:
+            raise ValueError(f"Recording name '{name}' is empty")
+        self._dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(slug)
+        recording.save(path)
+        with self._lock:
+            self._cache[slug] = (path.stat().st_mtime_ns, recording)
+        return slug
+
+    def load(self, name: str) -> Recording | None:
+        path = self.path(name)
+        try:
+            mtime = path.stat().st_mtime_ns
+            with self._lock:
+                cached = self._cache.get(name)
+                if cached is not None and cached[0] == mtime:
+                    return cached[1]
+            recording = Recording.load(path)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._cache[name] = (mtime, recording)
+        return recording
+
+    def delete(self, name: str):
+        with self._lock:
+            self._cache.pop(name, None)
+        self.path(name).unlink(missing_ok=True)
@@ -0,0 +1,253 @@
+import argparse
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from app.models.input_event import InputEvent
+from app.models.mapping_item import MappingItem
+from app.store.mapping_store import ChangeListener, default_config_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mappings (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    source_type TEXT NOT NULL,
+    source_value TEXT NOT NULL,
+    enabled INTEGER NOT NULL,
+    settings TEXT NOT NULL,
+    target TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mappings_position ON mappings (position);
+CREATE INDEX IF NOT EXISTS mappings_source ON mappings (source_type, source_value);
+CREATE INDEX IF NOT EXISTS mappings_enabled ON mappings (enabled);
+"""
+
+ITEM_COLUMNS = "id, source_type, source_value, enabled, settings, target"
+
+
+def _row_values(item: MappingItem) -> tuple:
+    data = item.to_dict()
+    target = data.pop("target")
+    for key in ("id", "source", "enabled"):
+        data.pop(key)
+    return (
+        item.source.event_type,
+        item.source.value,
+        int(item.enabled),
+        json.dumps(data, ensure_ascii=False),
+        json.dumps(target, ensure_ascii=False),
+    )
+
+
+def _item_from_row(row) -> MappingItem:
+    item_id, source_type, source_value, enabled, settings, target = row
+    data = json.loads(settings)
+    data.update(
+        id=item_id,
+        source={"event_type": source_type, "value": source_value},
+        enabled=bool(enabled),
+        target=json.loads(target),
+    )
+    return MappingItem.from_dict(data)
+
+
+class SqliteMappingStore:
+    def __init__(self, os_type: str, config_dir: Path | None = None):
+        self._config_dir = Path(config_dir) if config_dir is not None else default_config_dir()
+        self._config_dir.mkdir(exist_ok=True)
+        self._file_path = self._config_dir / f"{os_type}_mappings.db"
+        self._conn = sqlite3.connect(self._file_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._items: dict[str, MappingItem] = {}
+        self._listeners: list[ChangeListener] = []
+
+    @property
+    def config_dir(self) -> Path:
+        return self._config_dir
+
+    def add_listener(self, listener: ChangeListener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: ChangeListener):
+        self._listeners.remove(listener)
+
+    def load(self):
+        with self._lock:
+            self._items = {}
+
+    def save(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _notify(self, changed_ids: list[str]):
+        if not changed_ids:
+            return
+        for listener in list(self._listeners):
+            listener(changed_ids)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM mappings").fetchone()[0]
+
+    def ids(self) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT id FROM mappings ORDER BY position")
+            return [row[0] for row in rows]
+
+    def get(self, item_id: str) -> MappingItem | None:
+        with self._lock:
+            item = self._items.get(item_id)
+            if item is None:
+                row = self._conn.execute(
+                    f"SELECT {ITEM_COLUMNS} FROM mappings WHERE id = ?", (item_id,)
+                ).fetchone()
+                if row is None:
+                    return None
+                item = self._items[item_id] = _item_from_row(row)
+            return item
+
+    def _select(self, where: str = "", params: tuple = ()) -> list[MappingItem]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {ITEM_COLUMNS} FROM mappings {where} ORDER BY position", params
+            ).fetchall()
+            items = []
+            for row in rows:
+                item = self._items.get(row[0])
+                if item is None:
+                    item = self._items[row[0]] = _item_from_row(row)
+                items.append(item)
+            return items
+
+    def get_all(self) -> list[MappingItem]:
+        return self._select()
+
+    def get_enabled(self) -> list[MappingItem]:
+        return self._select("WHERE enabled = 1")
+
+    def find_by_source(self, source: InputEvent) -> list[MappingItem]:
+        return self._select(
+            "WHERE source_type = ? AND source_value = ?", (source.event_type, source.value)
+        )
+
+    def add(self, item: MappingItem):
+        self.add_many([item])
+
+    def add_many(self, items: Iterable[MappingItem]) -> list[str]:
+        items = list(items)
+        with self._lock, self._conn:
+            position = self._conn.execute(
+                "SELECT COALESCE(MAX(position), -1) FROM mappings"
+            ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT INTO mappings"
+                " (id, position, source_type, source_value, enabled, settings, target)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET position = excluded.position,"
+                " source_type = excluded.source_type, source_value = excluded.source_value,"
+                " enabled = excluded.enabled, settings = excluded.settings,"
+                " target = excluded.target",
+                [
+                    (item.id, position + offset, *_row_values(item))
+                    for offset, item in enumerate(items, start=1)
+                ],
+            )
+            for item in items:
+                self._items[item.id] = item
+        changed = [item.id for item in items]
+        self._notify(changed)
+        return changed
+
+    def update(self, item: MappingItem):
+        self.update_many([item])
+
+    def update_many(self, items: Iterable[MappingItem]):
+        changed = []
+        with self._lock, self._conn:
+            for item in items:
+                cursor = self._conn.execute(
+                    "UPDATE mappings SET source_type = ?, source_value = ?, enabled = ?,"
+                    " settings = ?, target = ? WHERE id = ?",
+                    (*_row_values(item), item.id),
+                )
+                if cursor.rowcount:
+                    self._items[item.id] = item
+                    changed.append(item.id)
+        self._notify(changed)
+
+    def delete(self, item_id: str):
+        self.delete_many([item_id])
+
+    def delete_many(self, item_ids: Iterable[str]):
+        changed = []
+        with self._lock, self._conn:
+            for item_id in item_ids:
+                cursor = self._conn.execute("DELETE FROM mappings WHERE id = ?", (item_id,))
+                self._items.pop(item_id, None)
+                if cursor.rowcount:
+                    changed.append(item_id)
+        self._notify(changed)
+
+    def set_enabled_many(self, item_ids: Iterable[str], enabled: bool):
+        flag = int(enabled)
+        changed = []
+        with self._lock, self._conn:
+            for item_id in item_ids:
+                cursor = self._conn.execute(
+                    "UPDATE mappings SET enabled = ? WHERE id = ? AND enabled != ?",
+                    (flag, item_id, flag),
+                )
+                if cursor.rowcount:
+                    changed.append(item_id)
+                    item = self._items.get(item_id)
+                    if item is not None:
+                        item.enabled = enabled
+        self._notify(changed)
+
+    def _flip(self, item_id: str, field: str):
+        item = self.get(item_id)
+        if item is None:
+            return
+        setattr(item, field, not getattr(item, field))
+        self.update_many([item])
+
+    def toggle(self, item_id: str):
+        self._flip(item_id, "enabled")
+
+    def toggle_turbo(self, item_id: str):
+        self._flip(item_id, "turbo")
+
+    def toggle_loop(self, item_id: str):
+        self._flip(item_id, "loop")
+
+    def import_json(self, path: Path) -> int:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return len(self.add_many(MappingItem.from_dict(item) for item in data))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a JSON mappings file into SQLite")
+    parser.add_argument("json_file", type=Path, help="e.g. config/windows_mappings.json")
+    args = parser.parse_args()
+
+    json_file: Path = args.json_file
+    os_type = json_file.name.removesuffix(".json").removesuffix("_mappings")
+    store = SqliteMappingStore(os_type, config_dir=json_file.parent)
+    count = store.import_json(json_file)
+    store.close()
+    print(f"Imported {count} mappings into {json_file.with_suffix('.db')}")
+
+
+if __name__ == "__main__":
+    main()
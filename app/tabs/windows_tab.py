@@ -1,8 +1,12 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
 
 from app.store.mapping_store import MappingStore
+from app.store.profile_store import ProfileStore
+from app.store.recording_store import RecordingStore
 from app.widgets.mapping_table import MappingTable
 from app.widgets.mapping_dialog import MappingDialog
+from app.widgets.profile_bar import ProfileBar
+from app.widgets.recorder_bar import RecorderBar
 from app.widgets.toggle_button import ToggleButton
 from app.engine.hook_engine import HookEngine
 from app.models.mapping_item import MappingItem
@@ -12,8 +16,10 @@ class WindowsTab(QWidget):
     def __init__(self):
         super().__init__()
 
-        self._store = MappingStore(os_type="windows")
+        self._profiles = ProfileStore(os_type="windows")
+        self._recordings = RecordingStore(self._profiles.config_dir)
         self._engine = HookEngine()
+        self._engine.recording_loader = self._recordings.load
 
         layout = QVBoxLayout(self)
 
@@ -23,52 +29,80 @@ class WindowsTab(QWidget):
         self._toggle.toggled_state.connect(self._on_toggle)
         layout.addWidget(self._toggle)
 
-        self._table = MappingTable(self._store)
+        self._profile_bar = ProfileBar(self._profiles, self._engine)
+        self._profile_bar.profile_shown.connect(self._on_profile_shown)
+        self._profile_bar.profiles_changed.connect(self._on_profiles_changed)
+        layout.addWidget(self._profile_bar)
+
+        self._recorder_bar = RecorderBar(self._engine, self._recordings)
+        self._recorder_bar.recording_saved.connect(self._on_recording_saved)
+        layout.addWidget(self._recorder_bar)
+
+        self._table = MappingTable(self._profiles.active_store, self._profiles.active)
         self._table.add_requested.connect(self._on_add)
         self._table.edit_requested.connect(self._on_edit)
-        self._table.mapping_changed.connect(self._on_mapping_changed)
         self._table.preset_requested.connect(self._on_preset)
         layout.addWidget(self._table)
 
+        self._profiles.add_listener(self._on_store_changed)
+
+    @property
+    def engine(self) -> HookEngine:
+        return self._engine
+
+    @property
+    def store(self) -> MappingStore:
+        return self._profiles.active_store
+
+    @property
+    def profiles(self) -> ProfileStore:
+        return self._profiles
+
     def _on_toggle(self, active: bool):
         if active:
-            self._engine.start(self._store.get_all())
+            self._engine.start_profiles(
+                self._profiles.mappings_by_profile(), self._profiles.active
+            )
+            self._profile_bar.start_auto_switch()
             self.window().statusBar().showMessage("Running")
         else:
+            self._profile_bar.stop_auto_switch()
             self._engine.stop()
             self.window().statusBar().showMessage("Stopped")
 
     def _on_add(self):
-        dialog = MappingDialog(self)
+        dialog = MappingDialog(self, recordings=self._recordings.names())
         if dialog.exec():
             mapping = dialog.get_mapping()
             if mapping:
-                self._store.add(mapping)
-                self._table.refresh()
-                self._restart_engine_if_running()
+                self.store.add(mapping)
 
     def _on_edit(self, mapping: MappingItem):
-        dialog = MappingDialog(self, mapping=mapping)
+        dialog = MappingDialog(self, mapping=mapping, recordings=self._recordings.names())
         if dialog.exec():
             updated = dialog.get_mapping()
             if updated:
-                self._store.update(updated)
-                self._table.refresh()
-                self._restart_engine_if_running()
+                self.store.update(updated)
 
     def _on_preset(self, preset_name: str):
-        dialog = MappingDialog(self, preset=preset_name)
+        dialog = MappingDialog(self, preset=preset_name, recordings=self._recordings.names())
         if dialog.exec():
             mapping = dialog.get_mapping()
             if mapping:
-                self._store.add(mapping)
-                self._table.refresh()
-                self._restart_engine_if_running()
+                self.store.add(mapping)
 
-    def _on_mapping_changed(self):
-        self._restart_engine_if_running()
+    def _on_profile_shown(self, name: str):
+        self._table.set_store(self._profiles.store(name), name)
 
-    def _restart_engine_if_running(self):
+    def _on_profiles_changed(self):
         if self._engine.is_running:
-            self._engine.stop()
-            self._engine.start(self._store.get_all())
+            self._engine.update_profiles(
+                self._profiles.mappings_by_profile(), self._profiles.active
+            )
+
+    def _on_recording_saved(self, name: str):
+        self._on_profiles_changed()
+
+    def _on_store_changed(self, profile: str, changed_ids: list[str]):
+        if self._engine.is_running:
+            self._engine.update_mappings(self._profiles.store(profile).get_enabled(), profile)
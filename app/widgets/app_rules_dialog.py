@@ -0,0 +1,83 @@
+from PySide6.QtWidgets import (
+    QComboBox,
+    QDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QInputDialog,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+
+class AppRulesDialog(QDialog):
+    def __init__(self, parent, rules: dict[str, str], profiles: list[str], last_app: str = ""):
+        super().__init__(parent)
+        self.setWindowTitle("Application Profiles")
+        self.setMinimumSize(420, 300)
+        self._profiles = profiles
+        self._last_app = last_app
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(
+            QLabel("Activate a profile while one of these applications has focus.")
+        )
+
+        self._table = QTableWidget(0, 2)
+        self._table.setHorizontalHeaderLabels(["Application", "Profile"])
+        self._table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self._table.verticalHeader().setVisible(False)
+        layout.addWidget(self._table)
+        for app, profile in rules.items():
+            self._add_row(app, profile)
+
+        row_layout = QHBoxLayout()
+        add_btn = QPushButton("Add")
+        add_btn.clicked.connect(self._on_add)
+        row_layout.addWidget(add_btn)
+        remove_btn = QPushButton("Remove")
+        remove_btn.clicked.connect(self._on_remove)
+        row_layout.addWidget(remove_btn)
+        row_layout.addStretch()
+        layout.addLayout(row_layout)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        ok_btn = QPushButton("OK")
+        ok_btn.clicked.connect(self.accept)
+        btn_layout.addWidget(ok_btn)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(cancel_btn)
+        layout.addLayout(btn_layout)
+
+    def _add_row(self, app: str, profile: str):
+        row = self._table.rowCount()
+        self._table.insertRow(row)
+        self._table.setItem(row, 0, QTableWidgetItem(app))
+        combo = QComboBox()
+        combo.addItems(self._profiles)
+        combo.setCurrentText(profile)
+        self._table.setCellWidget(row, 1, combo)
+
+    def _on_add(self):
+        app, ok = QInputDialog.getText(
+            self, "Add Application", "Process name (e.g. notepad.exe):", text=self._last_app
+        )
+        if ok and app.strip():
+            self._add_row(app.strip().lower(), self._profiles[0])
+
+    def _on_remove(self):
+        row = self._table.currentRow()
+        if row >= 0:
+            self._table.removeRow(row)
+
+    def get_rules(self) -> dict[str, str]:
+        rules = {}
+        for row in range(self._table.rowCount()):
+            app = self._table.item(row, 0).text().strip().lower()
+            if app:
+                rules[app] = self._table.cellWidget(row, 1).currentText()
+        return rules
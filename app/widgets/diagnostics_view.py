@@ -0,0 +1,169 @@
+from pathlib import Path
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QApplication,
+    QCheckBox,
+    QDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from app.engine.metrics import (
+    DEFAULT_EXPORT_PORT,
+    EngineMetrics,
+    MetricsFileDumper,
+    MetricsHttpExporter,
+    render_prometheus,
+)
+
+REFRESH_INTERVAL_MS = 1000
+
+
+class DiagnosticsDialog(QDialog):
+    def __init__(self, parent, status: "DiagnosticsStatus"):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.setMinimumSize(640, 320)
+        self._status = status
+
+        layout = QVBoxLayout(self)
+
+        self._table = QTableWidget()
+        self._table.setColumnCount(6)
+        self._table.setHorizontalHeaderLabels(
+            ["Engine", "Input", "Triggers", "Injected", "p50 ms", "p99 ms"]
+        )
+        self._table.horizontalHeader().setSectionResizeMode(
+            1, QHeaderView.ResizeMode.Stretch
+        )
+        self._table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
+        self._table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self._table.verticalHeader().setVisible(False)
+        layout.addWidget(self._table)
+
+        self._http_check = QCheckBox(f"Serve /metrics on 127.0.0.1:{DEFAULT_EXPORT_PORT}")
+        self._http_check.setChecked(status.http_exporter.is_running)
+        self._http_check.toggled.connect(self._on_http_toggled)
+        layout.addWidget(self._http_check)
+
+        self._dump_check = QCheckBox(f"Write {status.dump_path.name} every 10 s")
+        self._dump_check.setChecked(status.file_dumper.is_running)
+        self._dump_check.toggled.connect(status.set_dump_enabled)
+        layout.addWidget(self._dump_check)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        copy_btn = QPushButton("Copy Prometheus Text")
+        copy_btn.clicked.connect(
+            lambda: QApplication.clipboard().setText(status.render())
+        )
+        btn_layout.addWidget(copy_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        self.refresh()
+
+    def _on_http_toggled(self, checked: bool):
+        if not self._status.set_http_enabled(checked):
+            self._http_check.setChecked(False)
+
+    def refresh(self):
+        rows = [
+            (name, m)
+            for name, metrics in self._status.engines.items()
+            for m in list(metrics.mappings.values())
+        ]
+        self._table.setRowCount(len(rows))
+        for row, (name, m) in enumerate(rows):
+            values = [
+                name,
+                m.label,
+                str(m.triggers),
+                str(m.injected),
+                f"{m.latency.quantile(0.5):g}",
+                f"{m.latency.quantile(0.99):g}",
+            ]
+            for column, value in enumerate(values):
+                cell = QTableWidgetItem(value)
+                if column >= 2:
+                    cell.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self._table.setItem(row, column, cell)
+
+
+class DiagnosticsStatus(QWidget):
+    def __init__(self, engines: dict[str, EngineMetrics], dump_path: Path):
+        super().__init__()
+        self.engines = engines
+        self.dump_path = dump_path
+        self.http_exporter = MetricsHttpExporter(self.render)
+        self.file_dumper = MetricsFileDumper(self.render, dump_path)
+        self._dialog: DiagnosticsDialog | None = None
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self._summary = QLabel()
+        layout.addWidget(self._summary)
+        details_btn = QPushButton("Diagnostics")
+        details_btn.setFlat(True)
+        details_btn.clicked.connect(self._show_dialog)
+        layout.addWidget(details_btn)
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(REFRESH_INTERVAL_MS)
+        self.refresh()
+
+    def add_engine(self, name: str, metrics: EngineMetrics):
+        self.engines = {**self.engines, name: metrics}
+        self.refresh()
+
+    def render(self) -> str:
+        return render_prometheus(self.engines)
+
+    def refresh(self):
+        engines = self.engines.values()
+        self._summary.setText(
+            f"Triggers {sum(m.triggers for m in engines)} · "
+            f"Injected {sum(m.injected for m in engines)} · "
+            f"Suppressed {sum(m.suppressed for m in engines)} · "
+            f"Loops {sum(m.live_loops() for m in engines)} · "
+            f"Errors {sum(m.macro_errors() for m in engines)}"
+        )
+        if self._dialog and self._dialog.isVisible():
+            self._dialog.refresh()
+
+    def set_http_enabled(self, enabled: bool) -> bool:
+        if not enabled:
+            self.http_exporter.stop()
+            return True
+        try:
+            self.http_exporter.start()
+        except OSError as e:
+            self.window().statusBar().showMessage(f"Metrics endpoint unavailable: {e}")
+            return False
+        return True
+
+    def set_dump_enabled(self, enabled: bool):
+        if enabled:
+            self.file_dumper.start()
+        else:
+            self.file_dumper.stop()
+
+    def shutdown(self):
+        self.http_exporter.stop()
+        self.file_dumper.stop()
+
+    def _show_dialog(self):
+        if self._dialog is None:
+            self._dialog = DiagnosticsDialog(self.window(), self)
+        self._dialog.show()
+        self._dialog.raise_()
@@ -0,0 +1,43 @@
+from PySide6.QtCore import QEvent, QModelIndex, Qt, Signal
+from PySide6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton
+
+
+class ClickableDelegate(QStyledItemDelegate):
+    clicked = Signal(QModelIndex)
+
+    def _style(self, option) -> QStyle:
+        return option.widget.style() if option.widget else QApplication.style()
+
+    def editorEvent(self, event, model, option, index):
+        if (
+            event.type() == QEvent.Type.MouseButtonRelease
+            and event.button() == Qt.MouseButton.LeftButton
+            and option.rect.contains(event.position().toPoint())
+        ):
+            self.clicked.emit(index)
+            return True
+        return event.type() in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonDblClick)
+
+
+class CheckBoxDelegate(ClickableDelegate):
+    def paint(self, painter, option, index):
+        style = self._style(option)
+        checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+        button = QStyleOptionButton()
+        button.state = QStyle.StateFlag.State_Enabled | (
+            QStyle.StateFlag.State_On if checked else QStyle.StateFlag.State_Off
+        )
+        size = style.subElementRect(QStyle.SubElement.SE_CheckBoxIndicator, button, None).size()
+        button.rect = QStyle.alignedRect(
+            option.direction, Qt.AlignmentFlag.AlignCenter, size, option.rect
+        )
+        style.drawControl(QStyle.ControlElement.CE_CheckBox, button, painter)
+
+
+class ButtonDelegate(ClickableDelegate):
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.text = index.data(Qt.ItemDataRole.DisplayRole) or ""
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+        self._style(option).drawControl(QStyle.ControlElement.CE_PushButton, button, painter)
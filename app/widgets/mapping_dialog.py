@@ -1,4 +1,4 @@
-from PySide6.QtCore import Qt, QEvent
+from PySide6.QtCore import Qt, QEvent, Signal
 from PySide6.QtGui import QKeyEvent, QMouseEvent
 from PySide6.QtWidgets import (
     QApplication,
@@ -9,11 +9,27 @@ from PySide6.QtWidgets import (
     QPushButton,
     QGroupBox,
     QSpinBox,
+    QDoubleSpinBox,
     QCheckBox,
+    QComboBox,
 )
 
 from app.models.input_event import InputEvent
-from app.models.mapping_item import MappingItem
+from app.models.mapping_item import (
+    DEFAULT_HOLD_MS,
+    DEFAULT_SETTLE_MS,
+    DEFAULT_TURBO_HZ,
+    MAX_TURBO_HZ,
+    TRIGGER_COALESCE,
+    TRIGGER_DROP,
+    TRIGGER_ONCE,
+    TRIGGER_QUEUE,
+    TRIGGER_REPEAT,
+    TRIGGER_RESTART,
+    MappingItem,
+    StepTiming,
+)
+from app.widgets.step_timing_dialog import StepTimingDialog
 
 KEY_MAP = {
     Qt.Key.Key_A: "a", Qt.Key.Key_B: "b", Qt.Key.Key_C: "c",
@@ -72,18 +88,55 @@ MOUSE_BUTTON_MAP = {
 }
 
 
+MODIFIER_KEY_VALUES = {
+    Qt.Key.Key_Shift: "shift",
+    Qt.Key.Key_Control: "ctrl",
+    Qt.Key.Key_Alt: "alt",
+    Qt.Key.Key_Meta: "meta",
+}
+
+CHORD_MODIFIERS = (
+    (Qt.KeyboardModifier.ControlModifier, "ctrl"),
+    (Qt.KeyboardModifier.AltModifier, "alt"),
+    (Qt.KeyboardModifier.ShiftModifier, "shift"),
+    (Qt.KeyboardModifier.MetaModifier, "meta"),
+)
+
+
+def _ms_spin(value: float) -> QDoubleSpinBox:
+    spin = QDoubleSpinBox()
+    spin.setRange(0, 10000)
+    spin.setDecimals(1)
+    spin.setSuffix(" ms")
+    spin.setValue(value)
+    return spin
+
+
+def _chord_modifiers(modifiers, exclude: str | None = None) -> list[str]:
+    return [name for flag, name in CHORD_MODIFIERS if modifiers & flag and name != exclude]
+
+
 class KeyCaptureButton(QPushButton):
-    def __init__(self, label: str = "Click to set key...", single: bool = False):
+    captured = Signal()
+
+    def __init__(
+        self, label: str = "Click to set key...", single: bool = False, chord: bool = False
+    ):
         super().__init__(label)
         self._capturing = False
         self._events: list[InputEvent] = []
+        self._modifiers: list[str] = []
         self._single = single
+        self._chord = chord
         self.clicked.connect(self._start_capture)
 
     def _start_capture(self):
         self._capturing = True
         self._events = []
-        if self._single:
+        self._modifiers = []
+        if self._chord:
+            self.setText("Press a key, a key chord or a mouse button...")
+        elif self._single:
             self.setText("Press a key or mouse button...")
         else:
             self.setText("Press keys in sequence... (Esc to finish)")
@@ -93,87 +146,101 @@ class KeyCaptureButton(QPushButton):
     def _stop_capture(self):
         QApplication.instance().removeEventFilter(self)
         self._capturing = False
-        if self._events:
-            self.setText(" → ".join(e.display_name() for e in self._events))
-        else:
+        self._update_text()
+        self.captured.emit()
+
+    def _update_text(self):
+        if not self._events:
             self.setText("Click to set key...")
+        elif self._chord:
+            names = [InputEvent.of("keyboard", m).display_name() for m in self._modifiers]
+            names.extend(e.display_name() for e in self._events)
+            self.setText(" + ".join(names))
+        else:
+            self.setText(" → ".join(e.display_name() for e in self._events))
 
     def get_events(self) -> list[InputEvent]:
         return list(self._events)
 
-    def set_events(self, events: list[InputEvent]):
+    def get_modifiers(self) -> list[str]:
+        return list(self._modifiers)
+
+    def set_events(self, events: list[InputEvent], modifiers: list[str] | None = None):
         self._events = list(events)
-        if events:
-            self.setText(" → ".join(e.display_name() for e in events))
-        else:
-            self.setText("Click to set key...")
+        self._modifiers = list(modifiers or [])
+        self._update_text()
 
     def clear_events(self):
         if self._capturing:
             QApplication.instance().removeEventFilter(self)
         self._events = []
+        self._modifiers = []
         self._capturing = False
         self.setText("Click to set key...")
 
-    def eventFilter(self, obj, event):
-        if self._capturing:
-            if event.type() == QEvent.Type.ShortcutOverride:
-                event.accept()
-                return True
-            if event.type() == QEvent.Type.KeyPress:
-                key_event = QKeyEvent(event)
-                if key_event.isAutoRepeat():
-                    return True
-                key = key_event.key()
-                if key == Qt.Key.Key_Escape:
-                    self._stop_capture()
-                    return True
-                is_numpad = bool(key_event.modifiers() & Qt.KeyboardModifier.KeypadModifier)
-                if is_numpad and key in NUMPAD_MAP:
-                    value = NUMPAD_MAP[key]
-                elif key in KEY_MAP:
-                    value = KEY_MAP[key]
-                else:
-                    return True
-                self._events.append(InputEvent(event_type="keyboard", value=value))
-                self.setText(" → ".join(e.display_name() for e in self._events))
-                if self._single:
-                    self._stop_capture()
-                return True
-        return super().eventFilter(obj, event)
-
-    def keyPressEvent(self, event: QKeyEvent):
-        if not self._capturing:
-            super().keyPressEvent(event)
-            return
+    def _capture(self, event: InputEvent, modifiers: list[str] | None = None):
+        if self._chord:
+            self._modifiers = modifiers or []
+        self._events.append(event)
+        self._update_text()
+        if self._single or self._chord:
+            self._stop_capture()
 
-        if event.isAutoRepeat():
+    def _handle_key_press(self, key_event: QKeyEvent):
+        if key_event.isAutoRepeat():
             return
-
-        key = event.key()
-
+        key = key_event.key()
         if key == Qt.Key.Key_Escape:
             self._stop_capture()
             return
-
-        is_numpad = bool(event.modifiers() & Qt.KeyboardModifier.KeypadModifier)
-
+        if self._chord and key in MODIFIER_KEY_VALUES:
+            return
+        is_numpad = bool(key_event.modifiers() & Qt.KeyboardModifier.KeypadModifier)
         if is_numpad and key in NUMPAD_MAP:
             value = NUMPAD_MAP[key]
         elif key in KEY_MAP:
             value = KEY_MAP[key]
         else:
             return
+        self._capture(
+            InputEvent.of("keyboard", value),
+            _chord_modifiers(key_event.modifiers()),
+        )
 
-        self._events.append(InputEvent(event_type="keyboard", value=value))
-        self.setText(" → ".join(e.display_name() for e in self._events))
+    def _handle_key_release(self, key_event: QKeyEvent):
+        if not self._chord or key_event.isAutoRepeat() or self._events:
+            return
+        value = MODIFIER_KEY_VALUES.get(key_event.key())
+        if value:
+            self._capture(
+                InputEvent.of("keyboard", value),
+                _chord_modifiers(key_event.modifiers(), exclude=value),
+            )
 
-        if self._single:
-            self._stop_capture()
+    def eventFilter(self, obj, event):
+        if self._capturing:
+            if event.type() == QEvent.Type.ShortcutOverride:
+                event.accept()
+                return True
+            if event.type() == QEvent.Type.KeyPress:
+                self._handle_key_press(QKeyEvent(event))
+                return True
+            if event.type() == QEvent.Type.KeyRelease:
+                self._handle_key_release(QKeyEvent(event))
+                return True
+        return super().eventFilter(obj, event)
+
+    def keyPressEvent(self, event: QKeyEvent):
+        if not self._capturing:
+            super().keyPressEvent(event)
+            return
+        self._handle_key_press(event)
 
     def keyReleaseEvent(self, event: QKeyEvent):
         if not self._capturing:
             super().keyReleaseEvent(event)
+            return
+        self._handle_key_release(event)
 
     def mousePressEvent(self, event: QMouseEvent):
         if not self._capturing:
@@ -182,22 +249,29 @@ class KeyCaptureButton(QPushButton):
 
         button = event.button()
         if button in MOUSE_BUTTON_MAP:
-            value = MOUSE_BUTTON_MAP[button]
-            self._events.append(InputEvent(event_type="mouse", value=value))
-            self.setText(" → ".join(e.display_name() for e in self._events))
-
-            if self._single:
-                self._stop_capture()
-
+            self._capture(
+                InputEvent.of("mouse", MOUSE_BUTTON_MAP[button]),
+                _chord_modifiers(event.modifiers()),
+            )
+
+
+TRIGGER_POLICY_LABELS = (
+    (TRIGGER_ONCE, "Fire once per press"),
+    (TRIGGER_REPEAT, "Fire on every key repeat"),
+    (TRIGGER_DROP, "Ignore presses while running"),
+    (TRIGGER_QUEUE, "Queue presses while running"),
+    (TRIGGER_RESTART, "Restart on each press"),
+    (TRIGGER_COALESCE, "Run once more after finishing"),
+)
 
 PRESETS = {
     "shift_arrow_turbo": {
         "target": [
-            InputEvent(event_type="keyboard", value="shift"),
-            InputEvent(event_type="keyboard", value="up"),
-            InputEvent(event_type="keyboard", value="down"),
-            InputEvent(event_type="keyboard", value="left"),
-            InputEvent(event_type="keyboard", value="right"),
+            InputEvent.of("keyboard", "shift"),
+            InputEvent.of("keyboard", "up"),
+            InputEvent.of("keyboard", "down"),
+            InputEvent.of("keyboard", "left"),
+            InputEvent.of("keyboard", "right"),
         ],
         "turbo": True,
         "loop": True,
@@ -207,30 +281,51 @@ PRESETS = {
 
 
 class MappingDialog(QDialog):
-    def __init__(self, parent=None, mapping: MappingItem | None = None, preset: str | None = None):
+    def __init__(
+        self,
+        parent=None,
+        mapping: MappingItem | None = None,
+        preset: str | None = None,
+        recordings: list[str] | None = None,
+    ):
         super().__init__(parent)
         self.setWindowTitle("Edit Mapping" if mapping else "Add Mapping")
         self.setMinimumWidth(400)
         self._result_mapping: MappingItem | None = None
         self._preset_loop = False
+        self._step_timings: list[StepTiming] = []
 
         layout = QVBoxLayout(self)
 
         source_group = QGroupBox("Input (Source)")
         source_layout = QVBoxLayout(source_group)
-        self._source_btn = KeyCaptureButton()
+        self._source_btn = KeyCaptureButton(chord=True)
         source_layout.addWidget(self._source_btn)
         layout.addWidget(source_group)
 
         target_group = QGroupBox("Output (Target)")
         target_layout = QVBoxLayout(target_group)
         self._target_btn = KeyCaptureButton()
+        self._target_btn.captured.connect(self._step_timings.clear)
         target_layout.addWidget(self._target_btn)
+        macro_layout = QHBoxLayout()
+        macro_layout.addWidget(QLabel("Recorded macro:"))
+        self._macro_combo = QComboBox()
+        self._macro_combo.addItem("(none)", None)
+        for name in recordings or []:
+            self._macro_combo.addItem(name, name)
+        self._macro_combo.currentIndexChanged.connect(self._on_macro_changed)
+        macro_layout.addWidget(self._macro_combo, 1)
+        target_layout.addLayout(macro_layout)
         layout.addWidget(target_group)
 
         options_group = QGroupBox("Options")
         options_layout = QVBoxLayout(options_group)
 
+        self._direct_check = QCheckBox("Direct remap (target is held while the source is held)")
+        self._direct_check.toggled.connect(self._on_direct_toggled)
+        options_layout.addWidget(self._direct_check)
+
         delay_layout = QHBoxLayout()
         delay_layout.addWidget(QLabel("Delay between keys:"))
         self._delay_spin = QSpinBox()
@@ -240,9 +335,44 @@ class MappingDialog(QDialog):
         delay_layout.addWidget(self._delay_spin)
         options_layout.addLayout(delay_layout)
 
+        timing_layout = QHBoxLayout()
+        timing_layout.addWidget(QLabel("Key hold:"))
+        self._hold_spin = _ms_spin(DEFAULT_HOLD_MS)
+        timing_layout.addWidget(self._hold_spin)
+        timing_layout.addWidget(QLabel("Modifier settle:"))
+        self._settle_spin = _ms_spin(DEFAULT_SETTLE_MS)
+        timing_layout.addWidget(self._settle_spin)
+        options_layout.addLayout(timing_layout)
+
+        self._steps_btn = QPushButton("Per-step timing...")
+        self._steps_btn.clicked.connect(self._on_step_timing)
+        options_layout.addWidget(self._steps_btn)
+
+        turbo_layout = QHBoxLayout()
         self._turbo_check = QCheckBox("Turbo")
         self._turbo_check.toggled.connect(self._on_turbo_toggled)
-        options_layout.addWidget(self._turbo_check)
+        turbo_layout.addWidget(self._turbo_check)
+        turbo_layout.addWidget(QLabel("Rate:"))
+        self._turbo_spin = QSpinBox()
+        self._turbo_spin.setRange(1, MAX_TURBO_HZ)
+        self._turbo_spin.setSuffix(" Hz")
+        self._turbo_spin.setValue(DEFAULT_TURBO_HZ)
+        self._turbo_spin.setEnabled(False)
+        turbo_layout.addWidget(self._turbo_spin)
+        turbo_layout.addStretch()
+        options_layout.addLayout(turbo_layout)
+
+        policy_layout = QHBoxLayout()
+        policy_layout.addWidget(QLabel("When pressed again:"))
+        self._policy_combo = QComboBox()
+        for policy, label in TRIGGER_POLICY_LABELS:
+            self._policy_combo.addItem(label, policy)
+        policy_layout.addWidget(self._policy_combo, 1)
+        options_layout.addLayout(policy_layout)
+
+        self._batched_check = QCheckBox("Send as one batch (no gaps between keys)")
+        self._batched_check.toggled.connect(self._on_batched_toggled)
+        options_layout.addWidget(self._batched_check)
 
         layout.addWidget(options_group)
 
@@ -267,10 +397,23 @@ class MappingDialog(QDialog):
 
         if mapping:
             self._editing_id = mapping.id
-            self._source_btn.set_events([mapping.source])
-            self._target_btn.set_events(mapping.target)
+            self._source_btn.set_events([mapping.source], mapping.source_modifiers)
+            macro = next((t for t in mapping.target if t.event_type == "macro"), None)
+            if macro is not None:
+                if self._macro_combo.findData(macro.value) < 0:
+                    self._macro_combo.addItem(macro.value, macro.value)
+                self._macro_combo.setCurrentIndex(self._macro_combo.findData(macro.value))
+            else:
+                self._target_btn.set_events(mapping.target)
             self._delay_spin.setValue(mapping.delay_ms)
+            self._hold_spin.setValue(mapping.hold_ms)
+            self._settle_spin.setValue(mapping.settle_ms)
+            self._turbo_spin.setValue(mapping.turbo_hz)
+            self._step_timings[:] = mapping.step_timings
             self._turbo_check.setChecked(mapping.turbo)
+            self._policy_combo.setCurrentIndex(self._policy_combo.findData(mapping.trigger_policy))
+            self._batched_check.setChecked(mapping.batched)
+            self._direct_check.setChecked(mapping.direct)
             if mapping.stop_key:
                 self._stop_key_btn.set_events([mapping.stop_key])
         else:
@@ -289,12 +432,47 @@ class MappingDialog(QDialog):
                 return False
         return super().focusNextPrevChild(next_child)
 
+    def _on_macro_changed(self, index: int):
+        keys = self._macro_combo.itemData(index) is None
+        self._target_btn.setEnabled(keys)
+        self._steps_btn.setEnabled(keys)
+
+    def _on_step_timing(self):
+        dialog = StepTimingDialog(self, self._target_btn.get_events(), self._step_timings)
+        if dialog.exec():
+            self._step_timings[:] = dialog.get_timings()
+
+    def _on_direct_toggled(self, checked: bool):
+        if checked:
+            self._macro_combo.setCurrentIndex(0)
+            self._turbo_check.setChecked(False)
+            self._batched_check.setChecked(False)
+        for widget in (
+            self._delay_spin,
+            self._hold_spin,
+            self._settle_spin,
+            self._steps_btn,
+            self._turbo_check,
+            self._policy_combo,
+            self._batched_check,
+            self._macro_combo,
+        ):
+            widget.setEnabled(not checked)
+
     def _on_turbo_toggled(self, checked: bool):
-        self._delay_spin.setEnabled(not checked)
+        self._delay_spin.setEnabled(not checked and not self._batched_check.isChecked())
+        self._turbo_spin.setEnabled(checked)
+
+    def _on_batched_toggled(self, checked: bool):
+        self._delay_spin.setEnabled(not checked and not self._turbo_check.isChecked())
 
     def _on_ok(self):
         source_events = self._source_btn.get_events()
-        target_events = self._target_btn.get_events()
+        macro = self._macro_combo.currentData()
+        if macro is not None:
+            target_events = [InputEvent.of("macro", macro)]
+        else:
+            target_events = self._target_btn.get_events()
 
         if not source_events or not target_events:
             return
@@ -312,6 +490,14 @@ class MappingDialog(QDialog):
             turbo=self._turbo_check.isChecked(),
             loop=self._preset_loop,
             stop_key=stop_key,
+            batched=self._batched_check.isChecked(),
+            source_modifiers=self._source_btn.get_modifiers(),
+            hold_ms=self._hold_spin.value(),
+            settle_ms=self._settle_spin.value(),
+            turbo_hz=self._turbo_spin.value(),
+            step_timings=list(self._step_timings) if macro is None else [],
+            trigger_policy=self._policy_combo.currentData(),
+            direct=self._direct_check.isChecked(),
         )
         self.accept()
 
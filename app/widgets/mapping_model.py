@@ -0,0 +1,96 @@
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from app.models.mapping_item import MappingItem
+from app.store.mapping_store import MappingStore
+
+COLUMNS = ["Active", "Input", "Output", "Delay", "Turbo", "Loop", "Stop Key", "Edit", "Delete"]
+(
+    COL_ACTIVE,
+    COL_INPUT,
+    COL_OUTPUT,
+    COL_DELAY,
+    COL_TURBO,
+    COL_LOOP,
+    COL_STOP_KEY,
+    COL_EDIT,
+    COL_DELETE,
+) = range(len(COLUMNS))
+
+CHECK_COLUMNS = {COL_ACTIVE: "enabled", COL_TURBO: "turbo", COL_LOOP: "loop"}
+BUTTON_COLUMNS = {COL_EDIT: "Edit", COL_DELETE: "Delete"}
+
+
+class MappingTableModel(QAbstractTableModel):
+    def __init__(self, store: MappingStore, parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self.reload()
+        store.add_listener(self._on_store_changed)
+
+    def set_store(self, store: MappingStore):
+        self._store.remove_listener(self._on_store_changed)
+        self._store = store
+        store.add_listener(self._on_store_changed)
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self._ids = self._store.ids()
+        self._rows = {item_id: row for row, item_id in enumerate(self._ids)}
+        self.endResetModel()
+
+    def mapping(self, row: int) -> MappingItem | None:
+        return self._store.get(self._ids[row])
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.mapping(index.row())
+        if item is None:
+            return None
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == COL_INPUT:
+                return item.source_display_name()
+            if column == COL_OUTPUT:
+                return " → ".join(t.display_name() for t in item.target)
+            if column == COL_DELAY:
+                return str(item.delay_ms)
+            if column == COL_STOP_KEY:
+                return item.stop_key.display_name() if item.stop_key else "-"
+            return BUTTON_COLUMNS.get(column)
+        if role == Qt.ItemDataRole.CheckStateRole and column in CHECK_COLUMNS:
+            checked = getattr(item, CHECK_COLUMNS[column])
+            return Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.TextAlignmentRole and column not in (COL_INPUT, COL_OUTPUT):
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def _on_store_changed(self, changed_ids: list[str]):
+        if len(self._ids) != len(self._store) or any(
+            item_id not in self._rows or self._store.get(item_id) is None
+            for item_id in changed_ids
+        ):
+            self.reload()
+            return
+        last_column = len(COLUMNS) - 1
+        for item_id in changed_ids:
+            row = self._rows[item_id]
+            self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
@@ -1,47 +1,66 @@
-from PySide6.QtCore import Signal, Qt
+from PySide6.QtCore import Signal
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QHeaderView,
     QPushButton,
-    QCheckBox,
     QMessageBox,
+    QLabel,
 )
 
 from app.store.mapping_store import MappingStore
 from app.models.mapping_item import MappingItem
+from app.widgets.item_delegates import ButtonDelegate, CheckBoxDelegate
+from app.widgets.mapping_model import (
+    BUTTON_COLUMNS,
+    CHECK_COLUMNS,
+    COL_ACTIVE,
+    COL_DELETE,
+    COL_EDIT,
+    COL_INPUT,
+    COL_LOOP,
+    COL_OUTPUT,
+    COL_TURBO,
+    MappingTableModel,
+)
 
 
 class MappingTable(QWidget):
-    mapping_changed = Signal()
     edit_requested = Signal(MappingItem)
     add_requested = Signal()
     preset_requested = Signal(str)
 
-    def __init__(self, store: MappingStore):
+    def __init__(self, store: MappingStore, profile: str = ""):
         super().__init__()
         self._store = store
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
 
-        self._table = QTableWidget()
-        self._table.setColumnCount(9)
-        self._table.setHorizontalHeaderLabels(
-            ["Active", "Input", "Output", "Delay", "Turbo", "Loop", "Stop Key", "Edit", "Delete"]
-        )
-        self._table.horizontalHeader().setSectionResizeMode(
-            1, QHeaderView.ResizeMode.Stretch
-        )
-        self._table.horizontalHeader().setSectionResizeMode(
-            2, QHeaderView.ResizeMode.Stretch
-        )
-        self._table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
-        self._table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self._profile_label = QLabel()
+        layout.addWidget(self._profile_label)
+        self._show_profile(profile)
+
+        self._model = MappingTableModel(store, self)
+        self._table = QTableView()
+        self._table.setModel(self._model)
+        header = self._table.horizontalHeader()
+        header.setSectionResizeMode(COL_INPUT, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(COL_OUTPUT, QHeaderView.ResizeMode.Stretch)
+        self._table.setSelectionMode(QTableView.SelectionMode.NoSelection)
+        self._table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self._table.verticalHeader().setVisible(False)
+
+        self._check_delegate = CheckBoxDelegate(self)
+        self._check_delegate.clicked.connect(self._on_check_clicked)
+        self._button_delegate = ButtonDelegate(self)
+        self._button_delegate.clicked.connect(self._on_button_clicked)
+        for column in CHECK_COLUMNS:
+            self._table.setItemDelegateForColumn(column, self._check_delegate)
+        for column in BUTTON_COLUMNS:
+            self._table.setItemDelegateForColumn(column, self._button_delegate)
         layout.addWidget(self._table)
 
         check_layout = QHBoxLayout()
@@ -64,79 +83,41 @@ class MappingTable(QWidget):
         btn_layout.addWidget(add_btn)
         layout.addLayout(btn_layout)
 
-        self.refresh()
-
-    def _make_centered_checkbox(self, checked: bool, callback) -> QWidget:
-        checkbox = QCheckBox()
-        checkbox.setChecked(checked)
-        checkbox.toggled.connect(callback)
-        widget = QWidget()
-        box = QHBoxLayout(widget)
-        box.addWidget(checkbox)
-        box.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        box.setContentsMargins(0, 0, 0, 0)
-        return widget
-
     def refresh(self):
-        mappings = self._store.get_all()
-        self._table.setRowCount(len(mappings))
-
-        for row, item in enumerate(mappings):
-            self._table.setCellWidget(
-                row, 0,
-                self._make_centered_checkbox(item.enabled, lambda _, iid=item.id: self._on_toggle(iid)),
-            )
-
-            self._table.setItem(row, 1, QTableWidgetItem(item.source.display_name()))
+        self._model.reload()
 
-            target_text = " → ".join(t.display_name() for t in item.target)
-            self._table.setItem(row, 2, QTableWidgetItem(target_text))
-
-            delay_item = QTableWidgetItem(str(item.delay_ms))
-            delay_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self._table.setItem(row, 3, delay_item)
-
-            self._table.setCellWidget(
-                row, 4,
-                self._make_centered_checkbox(item.turbo, lambda _, iid=item.id: self._on_toggle_turbo(iid)),
-            )
-
-            self._table.setCellWidget(
-                row, 5,
-                self._make_centered_checkbox(item.loop, lambda _, iid=item.id: self._on_toggle_loop(iid)),
-            )
-
-            stop_text = item.stop_key.display_name() if item.stop_key else "-"
-            stop_item = QTableWidgetItem(stop_text)
-            stop_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self._table.setItem(row, 6, stop_item)
-
-            edit_btn = QPushButton("Edit")
-            edit_btn.clicked.connect(lambda _, m=item: self.edit_requested.emit(m))
-            self._table.setCellWidget(row, 7, edit_btn)
+    def set_store(self, store: MappingStore, profile: str = ""):
+        self._store = store
+        self._model.set_store(store)
+        self._show_profile(profile)
 
-            del_btn = QPushButton("Delete")
-            del_btn.clicked.connect(lambda _, item_id=item.id: self._on_delete(item_id))
-            self._table.setCellWidget(row, 8, del_btn)
+    def _show_profile(self, profile: str):
+        self._profile_label.setText(f"Active profile: <b>{profile}</b>")
+        self._profile_label.setVisible(bool(profile))
 
     def _set_all_enabled(self, enabled: bool):
-        for item in self._store.get_all():
-            if item.enabled != enabled:
-                self._store.toggle(item.id)
-        self.refresh()
-        self.mapping_changed.emit()
-
-    def _on_toggle(self, item_id: str):
-        self._store.toggle(item_id)
-        self.mapping_changed.emit()
-
-    def _on_toggle_turbo(self, item_id: str):
-        self._store.toggle_turbo(item_id)
-        self.mapping_changed.emit()
-
-    def _on_toggle_loop(self, item_id: str):
-        self._store.toggle_loop(item_id)
-        self.mapping_changed.emit()
+        self._store.set_enabled_many(self._store.ids(), enabled)
+
+    def _on_check_clicked(self, index):
+        item = self._model.mapping(index.row())
+        if item is None:
+            return
+        column = index.column()
+        if column == COL_ACTIVE:
+            self._store.toggle(item.id)
+        elif column == COL_TURBO:
+            self._store.toggle_turbo(item.id)
+        elif column == COL_LOOP:
+            self._store.toggle_loop(item.id)
+
+    def _on_button_clicked(self, index):
+        item = self._model.mapping(index.row())
+        if item is None:
+            return
+        if index.column() == COL_EDIT:
+            self.edit_requested.emit(item)
+        elif index.column() == COL_DELETE:
+            self._on_delete(item.id)
 
     def _on_delete(self, item_id: str):
         reply = QMessageBox.question(
@@ -147,5 +128,4 @@ class MappingTable(QWidget):
         )
         if reply == QMessageBox.StandardButton.Yes:
             self._store.delete(item_id)
-            self.refresh()
-            self.mapping_changed.emit()
+    
\ No newline at end of file
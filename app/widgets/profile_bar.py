@@ -0,0 +1,161 @@
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import (
+    QComboBox,
+    QHBoxLayout,
+    QInputDialog,
+    QLabel,
+    QMessageBox,
+    QPushButton,
+    QWidget,
+)
+
+from app.engine.foreground import AppProfileSwitcher
+from app.engine.hook_engine import HookEngine
+from app.models.input_event import InputEvent
+from app.store.profile_store import DEFAULT_PROFILE, ProfileStore
+from app.widgets.app_rules_dialog import AppRulesDialog
+from app.widgets.mapping_dialog import KeyCaptureButton
+
+
+class ProfileBar(QWidget):
+    profile_shown = Signal(str)
+    profiles_changed = Signal()
+    _engine_switched = Signal(str, bool)
+
+    def __init__(self, profiles: ProfileStore, engine: HookEngine):
+        super().__init__()
+        self._profiles = profiles
+        self._engine = engine
+        self._switcher = AppProfileSwitcher(engine)
+        self._switcher.set_rules(profiles.app_rules, profiles.fallback)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        layout.addWidget(QLabel("Profile:"))
+        self._combo = QComboBox()
+        self._combo.setMinimumWidth(160)
+        self._combo.addItems(profiles.names)
+        self._combo.setCurrentText(profiles.active)
+        self._combo.currentTextChanged.connect(self._on_selected)
+        layout.addWidget(self._combo)
+
+        new_btn = QPushButton("New")
+        new_btn.clicked.connect(self._on_new)
+        layout.addWidget(new_btn)
+        self._delete_btn = QPushButton("Delete")
+        self._delete_btn.clicked.connect(self._on_delete)
+        layout.addWidget(self._delete_btn)
+        apps_btn = QPushButton("Apps...")
+        apps_btn.clicked.connect(self._on_apps)
+        layout.addWidget(apps_btn)
+
+        layout.addStretch()
+        layout.addWidget(QLabel("Switch key:"))
+        self._switch_btn = KeyCaptureButton(chord=True)
+        if profiles.switch_key:
+            self._switch_btn.set_events(
+                [InputEvent.of("keyboard", profiles.switch_key)],
+                profiles.switch_modifiers,
+            )
+        self._switch_btn.captured.connect(self._on_switch_key_captured)
+        layout.addWidget(self._switch_btn)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self._on_switch_key_cleared)
+        layout.addWidget(clear_btn)
+
+        engine.set_profile_switch_key(profiles.switch_key, profiles.switch_modifiers)
+        engine.on_profile_changed = self._engine_switched.emit
+        self._engine_switched.connect(self._on_engine_switched)
+        self._update_buttons()
+
+    def start_auto_switch(self):
+        self._switcher.start()
+
+    def stop_auto_switch(self):
+        self._switcher.stop()
+
+    def _update_buttons(self):
+        self._delete_btn.setEnabled(self._profiles.active != DEFAULT_PROFILE)
+
+    def _on_selected(self, name: str):
+        if not name or name == self._profiles.active:
+            return
+        self._profiles.set_active(name)
+        self._switcher.set_fallback(name)
+        self._engine.switch_profile(name)
+        self._update_buttons()
+        self.profile_shown.emit(name)
+
+    def _on_engine_switched(self, name: str, manual: bool):
+        self._profiles.set_active(name, persist=manual)
+        if manual:
+            self._switcher.set_fallback(name)
+        self._combo.blockSignals(True)
+        self._combo.setCurrentText(name)
+        self._combo.blockSignals(False)
+        self._update_buttons()
+        self.profile_shown.emit(name)
+
+    def _on_new(self):
+        name, ok = QInputDialog.getText(self, "New Profile", "Profile name:")
+        if not ok:
+            return
+        try:
+            self._profiles.add(name)
+        except ValueError as e:
+            QMessageBox.warning(self, "New Profile", str(e))
+            return
+        self._profiles.set_active(name.strip())
+        self._switcher.set_fallback(self._profiles.active)
+        self._reload_combo()
+
+    def _on_delete(self):
+        name = self._profiles.active
+        reply = QMessageBox.question(
+            self,
+            "Delete Profile",
+            f"Delete profile '{name}' and all of its mappings?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self._profiles.remove(name)
+            self._switcher.set_rules(self._profiles.app_rules, self._profiles.fallback)
+            self._reload_combo()
+
+    def _on_apps(self):
+        dialog = AppRulesDialog(
+            self,
+            self._profiles.app_rules,
+            self._profiles.names,
+            self._switcher.tracker.current,
+        )
+        if dialog.exec():
+            self._profiles.set_app_rules(dialog.get_rules())
+            self._switcher.set_rules(self._profiles.app_rules)
+            if self._engine.is_running:
+                self._switcher.start()
+
+    def _reload_combo(self):
+        self._combo.blockSignals(True)
+        self._combo.clear()
+        self._combo.addItems(self._profiles.names)
+        self._combo.setCurrentText(self._profiles.active)
+        self._combo.blockSignals(False)
+        self._update_buttons()
+        self.profiles_changed.emit()
+        self.profile_shown.emit(self._profiles.active)
+
+    def _on_switch_key_captured(self):
+        events = self._switch_btn.get_events()
+        if not events or events[0].event_type != "keyboard":
+            self._on_switch_key_cleared()
+            return
+        modifiers = self._switch_btn.get_modifiers()
+        self._profiles.set_switch_key(events[0].value, modifiers)
+        self._engine.set_profile_switch_key(events[0].value, modifiers)
+
+    def _on_switch_key_cleared(self):
+        self._switch_btn.clear_events()
+        self._profiles.set_switch_key(None)
+        self._engine.set_profile_switch_key(None)
@@ -0,0 +1,78 @@
+from PySide6.QtCore import QTimer, Signal
+from PySide6.QtWidgets import (
+    QHBoxLayout,
+    QInputDialog,
+    QLabel,
+    QMessageBox,
+    QPushButton,
+    QWidget,
+)
+
+from app.engine.hook_engine import HookEngine
+from app.store.recording_store import RecordingStore
+
+
+class RecorderBar(QWidget):
+    recording_saved = Signal(str)
+
+    def __init__(self, engine: HookEngine, recordings: RecordingStore):
+        super().__init__()
+        self._engine = engine
+        self._recordings = recordings
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self._record_btn = QPushButton("Record Macro")
+        self._record_btn.setCheckable(True)
+        self._record_btn.clicked.connect(self._on_clicked)
+        layout.addWidget(self._record_btn)
+        self._status = QLabel()
+        layout.addWidget(self._status)
+        layout.addStretch()
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(250)
+        self._timer.timeout.connect(self._update_status)
+
+    def _on_clicked(self, checked: bool):
+        if checked:
+            self._engine.start_recording()
+            self._record_btn.setText("Stop Recording")
+            self._timer.start()
+            self._update_status()
+        else:
+            self._finish()
+
+    def _update_status(self):
+        recording = self._engine.recording
+        if recording is None:
+            return
+        self._status.setText(
+            f"Recording: {len(recording)} events, {recording.duration:.1f} s, "
+            f"{recording.nbytes / 1024:.1f} KB"
+        )
+
+    def _finish(self):
+        self._timer.stop()
+        self._record_btn.setText("Record Macro")
+        recording = self._engine.stop_recording()
+        self._status.clear()
+        if recording is None:
+            return
+        recording.drop_trailing_click()
+        if not len(recording):
+            QMessageBox.information(self, "Record Macro", "Nothing was recorded.")
+            return
+        while True:
+            name, ok = QInputDialog.getText(self, "Save Recording", "Recording name:")
+            if not ok:
+                return
+            try:
+                slug = self._recordings.save(name, recording)
+            except (OSError, ValueError) as e:
+                QMessageBox.warning(self, "Save Recording", str(e))
+                continue
+            self._status.setText(f"Saved '{slug}' ({len(recording)} events)")
+            self.recording_saved.emit(slug)
+            return
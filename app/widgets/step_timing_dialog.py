@@ -0,0 +1,79 @@
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from app.models.input_event import InputEvent
+from app.models.mapping_item import StepTiming
+
+
+def _cell_text(value: float | None) -> str:
+    return "" if value is None else f"{value:g}"
+
+
+def _cell_value(item: QTableWidgetItem | None) -> float | None:
+    text = item.text().strip() if item is not None else ""
+    try:
+        return max(float(text), 0.0) if text else None
+    except ValueError:
+        return None
+
+
+class StepTimingDialog(QDialog):
+    def __init__(self, parent, target: list[InputEvent], timings: list[StepTiming]):
+        super().__init__(parent)
+        self.setWindowTitle("Per-step Timing")
+        self.setMinimumSize(380, 300)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Hold and gap per step in ms. Leave empty to use the defaults."))
+
+        self._table = QTableWidget(len(target), 3)
+        self._table.setHorizontalHeaderLabels(["Step", "Hold (ms)", "Gap after (ms)"])
+        self._table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self._table.verticalHeader().setVisible(False)
+        for row, event in enumerate(target):
+            timing = timings[row] if row < len(timings) else StepTiming()
+            step = QTableWidgetItem(event.display_name())
+            step.setFlags(step.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self._table.setItem(row, 0, step)
+            self._table.setItem(row, 1, QTableWidgetItem(_cell_text(timing.hold_ms)))
+            self._table.setItem(row, 2, QTableWidgetItem(_cell_text(timing.gap_ms)))
+        layout.addWidget(self._table)
+
+        btn_layout = QHBoxLayout()
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self._on_reset)
+        btn_layout.addWidget(reset_btn)
+        btn_layout.addStretch()
+        ok_btn = QPushButton("OK")
+        ok_btn.clicked.connect(self.accept)
+        btn_layout.addWidget(ok_btn)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(cancel_btn)
+        layout.addLayout(btn_layout)
+
+    def _on_reset(self):
+        for row in range(self._table.rowCount()):
+            self._table.item(row, 1).setText("")
+            self._table.item(row, 2).setText("")
+
+    def get_timings(self) -> list[StepTiming]:
+        timings = [
+            StepTiming(
+                hold_ms=_cell_value(self._table.item(row, 1)),
+                gap_ms=_cell_value(self._table.item(row, 2)),
+            )
+            for row in range(self._table.rowCount())
+        ]
+        while timings and timings[-1] == StepTiming():
+            timings.pop()
+        return timings
@@ -1,3 +1,7 @@
+import time
+
+STARTED = time.perf_counter()
+
 import sys
 
 from PySide6.QtWidgets import QApplication
@@ -6,8 +10,13 @@ from app.main_window import MainWindow
 
 
 def main():
+    imported = time.perf_counter()
     app = QApplication(sys.argv)
     window = MainWindow()
+    if "--measure-startup" in sys.argv:
+        from app.startup import install_startup_timer
+
+        install_startup_timer(window, STARTED, imported)
     window.show()
     sys.exit(app.exec())
 